@@ -1,13 +1,26 @@
 # brain/agent.py
-from .memory import Memory
-from .cognition import Cognition
+import asyncio
+from asb.brain import services
 
 class ASBAgent:
-    def __init__(self):
-        self.memory = Memory()
-        self.cognition = Cognition()
-
-    def ask(self, query):
-        context = self.memory.query(query)
-        answer = self.cognition.think(query, context)
-        return answer
\ No newline at end of file
+    def __init__(self, memory=None, cognition=None, top_k=6):
+        self.memory = memory or services.get_memory()
+        self.cognition = cognition or services.get_cognition()
+        # Candidates retrieved per question; Cognition packs them into its token budget
+        self.top_k = top_k
+
+    def ask(self, query, use_cache=True, filters=None):
+        context = self.memory.query(query, top_k=self.top_k, filters=filters)
+        answer = self.cognition.think(query, context, use_cache=use_cache)
+        return answer
+
+    def ask_stream(self, query, use_cache=True, filters=None):
+        """Yield the answer token by token. `filters` restrict retrieval (see Memory.search)."""
+        context = self.memory.query(query, top_k=self.top_k, filters=filters)
+        yield from self.cognition.stream(query, context, use_cache=use_cache)
+
+    async def aask_stream(self, query, use_cache=True, filters=None):
+        """Async-iterator form of ask_stream()."""
+        context = await asyncio.to_thread(self.memory.query, query, self.top_k, filters)
+        async for chunk in self.cognition.astream(query, context, use_cache=use_cache):
+            yield chunk
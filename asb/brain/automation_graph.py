@@ -1,39 +1,34 @@
 # asb/brain/automation_graph.py
 from langgraph.graph import StateGraph, END
-from asb.brain.reflection import ReflectionEngine
-from asb.brain.self_evaluator import SelfEvaluator
-from asb.brain.research_agent import ResearchAgent
-from asb.brain.memory_compressor import MemoryCompressor
+from asb.brain import services
 
 # Step 1 – define actions as functions
 def reflect(state):
     print("🪞 Running reflection...")
-    re = ReflectionEngine()
-    re.reflect()
+    services.get_reflection_engine().reflect()
     return {"stage": "reflected"}
 
 def evaluate(state):
     print("📊 Evaluating reflections...")
-    se = SelfEvaluator()
-    se.evaluate_recent_reflections(days=7)
+    services.get_evaluator().evaluate_recent_reflections(days=7)
     return {"stage": "evaluated"}
 
 def research(state):
     print("🔎 Conducting autonomous research...")
-    ra = ResearchAgent()
-    ra.run_autonomous_research(max_questions=2)
+    services.get_research_agent().run_autonomous_research(max_questions=2)
     return {"stage": "researched"}
 
 def compress(state):
     print("🧩 Compressing memory...")
-    mc = MemoryCompressor()
-    mc.compress_old_reflections(days=14)
+    services.get_compressor().compress_old_reflections(days=14)
     return {"stage": "compressed"}
 
 def evaluate_and_decide(state):
-    se = SelfEvaluator()
-    results = se.evaluate_recent_reflections()
-    avg_score = ... # compute from results
+    # Router after "evaluate": reads the scores that node just stored
+    averages = services.get_evaluator().store.averages(days=7)
+    if not averages["n"]:
+        return "research"
+    avg_score = (averages["clarity"] + averages["novelty"] + averages["actionability"]) / 3
     if avg_score < 6:
         return "research"  # low quality → do more research
     return "compress"      # good quality → consolidate
@@ -45,19 +40,15 @@ graph.add_node("evaluate", evaluate)
 graph.add_node("research", research)
 graph.add_node("compress", compress)
 
-# Step 3 – define the flow
+# Step 3 – define the flow: reflect → evaluate → (research →) compress
 graph.set_entry_point("reflect")
 graph.add_edge("reflect", "evaluate")
-graph.add_edge("evaluate", "research")
-graph.add_edge("research", "compress")
-graph.add_edge("compress", END)
-
-graph.add_node("evaluate_and_decide", evaluate_and_decide)
-graph.add_edge("reflect", "evaluate_and_decide")
 graph.add_conditional_edges(
-    "evaluate_and_decide",
+    "evaluate",
     evaluate_and_decide,
     {"research": "research", "compress": "compress"}
 )
+graph.add_edge("research", "compress")
+graph.add_edge("compress", END)
 
 workflow = graph.compile()
\ No newline at end of file
@@ -0,0 +1,100 @@
+# asb/brain/chunker.py
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "256"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "32"))
+
+# Words and individual punctuation marks — a cheap, model-agnostic token proxy
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+HEADING_RE = re.compile(r"^#{1,6}\s", re.MULTILINE)
+BOUNDARY_RE = re.compile(r"[.!?]\s|\n")
+
+
+def count_tokens(text: str) -> int:
+    return sum(1 for _ in TOKEN_RE.finditer(text))
+
+
+def iter_sections(text: str):
+    """Yield (start, end) offsets of markdown sections, split before each heading."""
+    starts = [m.start() for m in HEADING_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        if text[start:end].strip():
+            yield start, end
+
+
+def _snap_end(text: str, start: int, end: int) -> int:
+    """Pull a window end back to the last sentence/line break in its second half."""
+    cut = None
+    for m in BOUNDARY_RE.finditer(text, (start + end) // 2, end):
+        cut = m.start() + 1
+    return cut or end
+
+
+def _split_section(text: str, start: int, end: int, max_tokens: int, overlap: int):
+    """Yield (start, end) windows of at most max_tokens over an oversized section."""
+    spans = [(m.start(), m.end()) for m in TOKEN_RE.finditer(text, start, end)]
+    step = max(1, max_tokens - overlap)
+    i = 0
+    while i < len(spans):
+        j = min(i + max_tokens, len(spans))
+        w_start, w_end = spans[i][0], spans[j - 1][1]
+        if j < len(spans):
+            w_end = _snap_end(text, w_start, w_end)
+            # Make sure the next window starts within the overlap of this one
+            while j > i + 1 and spans[j - 1][1] > w_end:
+                j -= 1
+        yield w_start, w_end
+        if j >= len(spans):
+            break
+        i = max(i + 1, min(i + step, j - overlap))
+
+
+def iter_chunks(text: str, doc_id: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP):
+    """
+    Stream token-bounded chunks of a document.
+
+    Consecutive small markdown sections are packed together; sections larger
+    than max_tokens are split into windows that overlap by `overlap` tokens.
+    Each chunk carries its parent document id and character offsets.
+    """
+    overlap = min(overlap, max_tokens // 2)
+    pending_start = pending_end = None
+    pending_tokens = 0
+    index = 0
+
+    def make(start, end):
+        nonlocal index
+        chunk = {
+            "id": f"{doc_id}#{index}",
+            "parent_id": doc_id,
+            "index": index,
+            "start": start,
+            "end": end,
+            "text": text[start:end].strip(),
+        }
+        index += 1
+        return chunk
+
+    for start, end in iter_sections(text):
+        tokens = count_tokens(text[start:end])
+        if pending_start is not None and pending_tokens + tokens <= max_tokens:
+            pending_end, pending_tokens = end, pending_tokens + tokens
+            continue
+        if pending_start is not None:
+            yield make(pending_start, pending_end)
+            pending_start = None
+        if tokens <= max_tokens:
+            pending_start, pending_end, pending_tokens = start, end, tokens
+        else:
+            for w_start, w_end in _split_section(text, start, end, max_tokens, overlap):
+                yield make(w_start, w_end)
+
+    if pending_start is not None:
+        yield make(pending_start, pending_end)
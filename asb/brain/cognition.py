@@ -1,25 +1,114 @@
 # brain/cognition.py
-import os
-from langchain_ollama import OllamaLLM
-from dotenv import load_dotenv
+import time
+import logging
+from asb.brain import services
+from asb.brain.context_packer import CONTEXT_TOKENS, pack_context
 
-load_dotenv()
+log = logging.getLogger(__name__)
 
-class Cognition:
-    def __init__(self):
-        model = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-        self.llm = OllamaLLM(model=model)
-
-    def think(self, query, context):
-        context_str = "\n".join(context)
-        prompt = f"""You are Chitrank's Second Brain.
+PROMPT_TEMPLATE = """You are Chitrank's Second Brain.
 
 Context:
-{context_str}
+{context}
 
 Question:
 {query}
 
 Give a concise, insightful answer, referring only to the context."""
-        response = self.llm.invoke(prompt)
-        return response
\ No newline at end of file
+
+
+class Cognition:
+    def __init__(self, llm=None, cache=None, context_tokens: int = CONTEXT_TOKENS):
+        """
+        `cache` is an LLMResponseCache; by default one is opened only when
+        LLM_CACHE is enabled. Pass False to disable caching explicitly.
+        Retrieved context is packed into at most `context_tokens` tokens.
+        """
+        self.llm = llm or services.get_llm()
+        self.context_tokens = context_tokens
+        if cache is None:
+            from asb.brain.llm_cache import LLM_CACHE_ENABLED, LLMResponseCache
+            cache = LLMResponseCache() if LLM_CACHE_ENABLED else None
+        self.cache = cache or None
+        # Seconds until the first token of the most recent streamed answer
+        self.last_ttft = None
+
+    def pack(self, context):
+        """Deduplicate and trim retrieved passages (in relevance order) to the token budget."""
+        return pack_context(context, self.context_tokens)
+
+    def _prompt(self, query, context):
+        return PROMPT_TEMPLATE.format(context="\n".join(context), query=query)
+
+    def _model_name(self):
+        return getattr(self.llm, "model", None) or type(self.llm).__name__
+
+    def _cache_key(self, query, context, use_cache):
+        if not (use_cache and self.cache):
+            return None
+        from asb.brain.llm_cache import llm_params_of, response_key
+        return response_key(llm_params_of(self.llm), PROMPT_TEMPLATE, query, context)
+
+    def think(self, query, context, use_cache=True):
+        context = self.pack(context)
+        key = self._cache_key(query, context, use_cache)
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        response = self.llm.invoke(self._prompt(query, context))
+        if key:
+            self.cache.put(key, response, self._model_name())
+        return response
+
+    def _record(self, start, first, n_chunks):
+        total = time.perf_counter() - start
+        self.last_ttft = None if first is None else first - start
+        if first is not None:
+            log.info(f"⏱️ LLM stream: first token {self.last_ttft:.2f}s, total {total:.2f}s, {n_chunks} chunks")
+
+    def stream(self, query, context, use_cache=True):
+        """Like think(), but yields the answer as tokens arrive."""
+        context = self.pack(context)
+        start, first, n = time.perf_counter(), None, 0
+        key = self._cache_key(query, context, use_cache)
+        cached = self.cache.get(key) if key else None
+        parts = []
+        try:
+            chunks = [cached] if cached is not None else self.llm.stream(self._prompt(query, context))
+            for chunk in chunks:
+                if first is None:
+                    first = time.perf_counter()
+                n += 1
+                parts.append(chunk)
+                yield chunk
+        finally:
+            self._record(start, first, n)
+        # Only complete answers are cached (an abandoned generator never gets here)
+        if key and cached is None:
+            self.cache.put(key, "".join(parts), self._model_name())
+
+    async def astream(self, query, context, use_cache=True):
+        """Async-iterator form of stream()."""
+        context = self.pack(context)
+        start, first, n = time.perf_counter(), None, 0
+        key = self._cache_key(query, context, use_cache)
+        cached = self.cache.get(key) if key else None
+        parts = []
+        try:
+            if cached is not None:
+                first, n = time.perf_counter(), 1
+                parts.append(cached)
+                yield cached
+            else:
+                async for chunk in self.llm.astream(self._prompt(query, context)):
+                    if first is None:
+                        first = time.perf_counter()
+                    n += 1
+                    parts.append(chunk)
+                    yield chunk
+        finally:
+            self._record(start, first, n)
+        if key and cached is None:
+            self.cache.put(key, "".join(parts), self._model_name())
+
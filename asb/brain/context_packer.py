@@ -0,0 +1,98 @@
+# asb/brain/context_packer.py
+import os
+import re
+from dotenv import load_dotenv
+from asb.brain.chunker import TOKEN_RE, count_tokens
+
+load_dotenv()
+
+CONTEXT_TOKENS = int(os.getenv("CONTEXT_TOKENS", "1536"))
+# Passages sharing at least this fraction of word shingles are treated as duplicates
+NEAR_DUP_THRESHOLD = 0.8
+# Don't bother appending a passage fragment smaller than this
+MIN_FRAGMENT_TOKENS = 24
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _shingles(text: str, n: int = 3) -> set:
+    words = [w.lower() for w in re.findall(r"\w+", text)]
+    if len(words) < n:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def _is_near_duplicate(shingles: set, kept: list[set], threshold: float) -> bool:
+    for other in kept:
+        if not shingles or not other:
+            continue
+        overlap = len(shingles & other)
+        # Containment, so a passage fully inside a longer one also counts
+        if overlap / min(len(shingles), len(other)) >= threshold:
+            return True
+    return False
+
+
+def truncate_to_sentences(text: str, max_tokens: int, count=count_tokens) -> str:
+    """Longest prefix of whole sentences that fits in `max_tokens` ("" if not even one does)."""
+    out, used, pos = [], 0, 0
+    for m in [*SENTENCE_END_RE.finditer(text), None]:
+        end = m.start() if m else len(text)
+        sentence = text[pos:end]
+        if sentence.strip():
+            cost = count(sentence)
+            if used + cost > max_tokens:
+                break
+            out.append(text[pos:m.end() if m else end])
+            used += cost
+        if m:
+            pos = m.end()
+    return "".join(out).strip()
+
+
+def _hard_truncate(text: str, max_tokens: int) -> str:
+    spans = list(TOKEN_RE.finditer(text))
+    return text if len(spans) <= max_tokens else text[:spans[max_tokens - 1].end()]
+
+
+def pack_context(passages, max_tokens: int = CONTEXT_TOKENS, scores=None,
+                 count=count_tokens, threshold: float = NEAR_DUP_THRESHOLD) -> list[str]:
+    """
+    Select passages for a prompt within a token budget.
+
+    Passages are taken in relevance order — the order given, or by ascending
+    `scores` (distances) when provided. Near-duplicates of an already chosen
+    passage are dropped, and the passage that overflows the budget is cut
+    back to whole sentences. `count` is the token counter used for the budget.
+    """
+    passages = list(passages)
+    if scores is not None:
+        passages = [p for _, p in sorted(zip(scores, passages), key=lambda pair: pair[0])]
+
+    packed, kept, used = [], [], 0
+    for text in passages:
+        text = (text or "").strip()
+        if not text:
+            continue
+        shingles = _shingles(text)
+        if _is_near_duplicate(shingles, kept, threshold):
+            continue
+        remaining = max_tokens - used
+        cost = count(text)
+        if cost > remaining:
+            if remaining < MIN_FRAGMENT_TOKENS and packed:
+                break
+            cut = truncate_to_sentences(text, remaining, count)
+            if not cut:
+                if packed:
+                    break
+                # A single giant sentence: better a cut passage than no context
+                cut = _hard_truncate(text, remaining)
+            text = cut
+            cost = count(text)
+        packed.append(text)
+        kept.append(shingles)
+        used += cost
+        if used >= max_tokens:
+            break
+    return packed
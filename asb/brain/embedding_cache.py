@@ -0,0 +1,146 @@
+# asb/brain/embedding_cache.py
+import os
+import time
+import hashlib
+import threading
+from array import array
+from dotenv import load_dotenv
+from asb.brain.utils import open_sqlite
+
+load_dotenv()
+
+CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "./data/cache/embeddings.db")
+CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX", "200000"))
+
+# SQLite caps the number of bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_name_of(embedder) -> str:
+    """Best-effort identifier for a LangChain embedder (part of the cache key and of Memory's collection name)."""
+    if isinstance(embedder, CachedEmbeddings):
+        return embedder.model_name
+    for attr in ("model", "model_name"):
+        name = getattr(embedder, attr, None)
+        if name:
+            return f"{type(embedder).__name__}:{name}"
+    return type(embedder).__name__
+
+
+class EmbeddingCache:
+    """
+    Content-addressed vector cache on disk.
+
+    Vectors are keyed on (model, sha256(text)) and stored as packed float32
+    blobs. When the cache grows past `max_entries`, the least recently used
+    vectors are evicted.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = open_sqlite(path)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (model, text_hash)
+        ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, hashes: list[str]) -> dict:
+        """Return {text_hash: vector} for the hashes present in the cache."""
+        found = {}
+        with self.lock:
+            for i in range(0, len(hashes), _LOOKUP_CHUNK):
+                batch = hashes[i:i + _LOOKUP_CHUNK]
+                marks = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                    (model, *batch),
+                ).fetchall()
+                for h, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[h] = vec.tolist()
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                self.conn.commit()
+        return found
+
+    def put_many(self, model: str, items: dict):
+        """Store {text_hash: vector} and evict the oldest entries if over capacity."""
+        if not items:
+            return
+        now = time.time()
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, h, array("f", vec).tobytes(), now) for h, vec in items.items()],
+            )
+            self.size += self.conn.total_changes - before
+            if self.size > self.max_entries:
+                self._evict(self.size - self.max_entries)
+            self.conn.commit()
+
+    def _evict(self, count: int):
+        self.conn.execute("""
+        DELETE FROM embeddings WHERE (model, text_hash) IN (
+            SELECT model, text_hash FROM embeddings ORDER BY last_used LIMIT ?
+        )
+        """, (count,))
+        self.size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedEmbeddings:
+    """
+    Drop-in wrapper around any LangChain embedder.
+
+    Cache hits are served from disk; misses are de-duplicated and embedded
+    in a single batch call to the wrapped model.
+    """
+
+    def __init__(self, embedder, cache: EmbeddingCache = None, model_name: str = None):
+        self.embedder = embedder
+        self.cache = cache or EmbeddingCache()
+        self.model_name = model_name or model_name_of(embedder)
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [text_hash(t) for t in texts]
+        vectors = self.cache.get_many(self.model_name, list(dict.fromkeys(hashes)))
+
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in vectors:
+                missing.setdefault(h, t)
+        self.hits += len(texts) - sum(1 for h in hashes if h in missing)
+        self.misses += len(missing)
+
+        if missing:
+            fresh = self.embedder.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), fresh))
+            self.cache.put_many(self.model_name, computed)
+            vectors.update(computed)
+        return [vectors[h] for h in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
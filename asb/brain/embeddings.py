@@ -2,28 +2,17 @@ from langchain_ollama import OllamaEmbeddings
 from langchain_openai import OpenAIEmbeddings
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 from dotenv import load_dotenv
+from asb.brain.embedding_cache import CachedEmbeddings
+from asb.brain.services import is_ollama_running
 import os
-import subprocess
 
 load_dotenv()
 
-def is_ollama_running() -> bool:
-    """Check if Ollama server is running locally."""
-    try:
-        result = subprocess.run(
-            ["ollama", "list"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=2
-        )
-        return result.returncode == 0
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        return False
-
-def get_embedding_model():
+def get_embedding_model(cached: bool = True):
     if is_ollama_running():
-        return OllamaEmbeddings(model="nomic-embed-text")
+        embedder = OllamaEmbeddings(model="nomic-embed-text")
     elif os.getenv("OPENAI_API_KEY"):
-        return OpenAIEmbeddings()
+        embedder = OpenAIEmbeddings()
     else:
-        return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
\ No newline at end of file
+        embedder = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    return CachedEmbeddings(embedder) if cached else embedder
\ No newline at end of file
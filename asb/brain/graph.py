@@ -1,26 +1,305 @@
-import re, os, networkx as nx
+import re, os, hashlib
+from collections import Counter
+import numpy as np
+from dotenv import load_dotenv
 from asb.brain.logger import setup_logger
+from asb.brain.utils import atomic_write, open_sqlite
 log = setup_logger()
+load_dotenv()
+
+GRAPH_DB_PATH = "./data/graph/knowledge_graph.db"
+# Words at most GRAPH_WINDOW - 1 positions apart co-occur (2 = adjacent words only)
+GRAPH_WINDOW = int(os.getenv("GRAPH_WINDOW", "5"))
+WORD_RE = re.compile(r'\b[A-Za-z]{5,}\b')
+
+
+def note_edges(text: str, window: int = GRAPH_WINDOW) -> Counter:
+    """Count undirected co-occurrences between 5+ letter words within `window` of each other."""
+    words = [w.lower() for w in WORD_RE.findall(text)]
+    counts = Counter()
+    for offset in range(1, max(window, 2)):
+        for a, b in zip(words, words[offset:]):
+            if a != b:
+                counts[(a, b) if a < b else (b, a)] += 1
+    return counts
+
+
+class CooccurrenceMatrix:
+    """
+    Symmetric co-occurrence counts in CSR form (NumPy arrays).
+
+    Row i holds the neighbours of vocab[i] in indices[indptr[i]:indptr[i+1]]
+    with counts in the same slice of data. `df` is the number of notes each
+    word appears in (for TF-IDF scoring).
+    """
+
+    def __init__(self, vocab, indptr, indices, data, df, n_notes: int, version: int = 0):
+        self.vocab = np.asarray(vocab, dtype=str)
+        self.index = {str(w): i for i, w in enumerate(self.vocab)}
+        self.indptr, self.indices, self.data = indptr, indices, data
+        self.df = df
+        self.n_notes = max(int(n_notes), 1)
+        self.version = version
+        # Weighted degree: total co-occurrence count of each word
+        row_ids = np.repeat(np.arange(len(self.vocab)), np.diff(indptr))
+        self.degree = np.bincount(row_ids, weights=data, minlength=len(self.vocab))
+        self.total = float(data.sum())
+
+    @classmethod
+    def from_edges(cls, a, b, n, word_df: dict, n_notes: int, version: int = 0):
+        vocab = sorted(set(a) | set(b))
+        index = {w: i for i, w in enumerate(vocab)}
+        ai = np.fromiter((index[w] for w in a), dtype=np.int64, count=len(a))
+        bi = np.fromiter((index[w] for w in b), dtype=np.int64, count=len(b))
+        counts = np.asarray(n, dtype=np.float64)
+
+        rows = np.concatenate([ai, bi])
+        cols = np.concatenate([bi, ai])
+        vals = np.concatenate([counts, counts])
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(vocab)), out=indptr[1:])
+        df = np.array([word_df.get(w, 1) for w in vocab], dtype=np.float64)
+        return cls(vocab, indptr, cols[order], vals[order], df, n_notes, version)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as z:
+            return cls(z["vocab"], z["indptr"], z["indices"], z["data"], z["df"],
+                       int(z["n_notes"]), int(z["version"]))
+
+    def save(self, path: str):
+        # np.savez appends ".npz" to names without it, so the temp file keeps the extension
+        atomic_write(path, lambda tmp: np.savez(
+            tmp, vocab=self.vocab, indptr=self.indptr, indices=self.indices,
+            data=self.data, df=self.df, n_notes=self.n_notes, version=self.version,
+        ), suffix=".tmp.npz")
+
+    def _scores(self, rows, cols, counts, method: str):
+        if method == "count":
+            return counts
+        if method == "tfidf":
+            return counts * np.log(self.n_notes / self.df[cols] + 1.0)
+        if method == "pmi":
+            # Positive PMI with context-distribution smoothing (alpha = 0.75),
+            # which stops rare words from dominating the ranking
+            ctx = self.degree ** 0.75
+            p_ctx = ctx[cols] / ctx.sum()
+            p_word = self.degree[rows] / self.total
+            return np.maximum(np.log(counts / self.total / (p_word * p_ctx)), 0.0)
+        raise ValueError(f"Unknown scoring method '{method}' (use pmi, tfidf or count)")
+
+    def top_k(self, concepts: list[str], k: int = 10, method: str = "pmi") -> list[list[tuple]]:
+        """Ranked [(word, score)] neighbours for each concept, computed in one vectorised pass."""
+        ids = np.array([self.index.get(c.lower(), -1) for c in concepts], dtype=np.int64)
+        known = ids >= 0
+        if not known.any():
+            return [[] for _ in concepts]
+        starts = np.where(known, self.indptr[np.maximum(ids, 0)], 0)
+        lengths = np.where(known, self.indptr[np.maximum(ids, 0) + 1] - starts, 0)
+        if lengths.sum() == 0:
+            return [[] for _ in concepts]
+
+        # Gather every neighbour slice into flat arrays tagged with its query segment
+        seg = np.repeat(np.arange(len(concepts)), lengths)
+        seg_start = np.cumsum(lengths) - lengths
+        pos = starts[seg] + np.arange(lengths.sum()) - seg_start[seg]
+        rows, cols, counts = ids[seg], self.indices[pos], self.data[pos]
+        scores = self._scores(rows, cols, counts, method)
+
+        # Only positively associated neighbours count as related (PPMI clips the rest to 0)
+        positive = scores > 0
+        seg, cols, scores = seg[positive], cols[positive], scores[positive]
+        sizes = np.bincount(seg, minlength=len(concepts))
+        seg_start = np.cumsum(sizes) - sizes
+
+        # Segmented top-k: sort by (segment, -score) and keep the first k of each
+        order = np.lexsort((-scores, seg))
+        rank = np.arange(len(order)) - seg_start[seg[order]]
+        keep = order[rank < k]
+        results = [[] for _ in concepts]
+        for s, word, score in zip(seg[keep], self.vocab[cols[keep]], scores[keep]):
+            results[s].append((str(word), round(float(score), 4)))
+        return results
 
 
 class KnowledgeGraph:
-    def __init__(self, notes_dir="./data/notes"):
-        self.notes_dir = notes_dir
-        self.graph = nx.Graph()
+    """
+    Word co-occurrence graph persisted in SQLite.
+
+    `note_edges` records which note contributed which edge (and how often);
+    `edges` holds the totals and is kept in sync by triggers, so adding,
+    editing or deleting a note only touches that note's edges.
+    """
+
+    def __init__(self, notes_dir: str = None, db_path: str = GRAPH_DB_PATH):
+        # Same default as Memory, so the graph indexes the notes vector memory holds
+        self.notes_dir = notes_dir or os.getenv("DATA_DIR", "./data/notes")
+        self.conn = open_sqlite(db_path)
+        self.matrix_path = os.path.splitext(db_path)[0] + ".npz"
+        self._matrix = None
+        self._create_tables()
+        self._check_window()
+
+    def _create_tables(self):
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS notes (
+            path TEXT PRIMARY KEY,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS note_edges (
+            path TEXT NOT NULL,
+            a TEXT NOT NULL,
+            b TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (path, a, b)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS edges (
+            a TEXT NOT NULL,
+            b TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (a, b)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_edges_b ON edges(b);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+
+        CREATE TRIGGER IF NOT EXISTS trg_note_edges_add AFTER INSERT ON note_edges BEGIN
+            INSERT INTO edges (a, b, n) VALUES (NEW.a, NEW.b, NEW.n)
+            ON CONFLICT(a, b) DO UPDATE SET n = n + NEW.n;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_note_edges_remove AFTER DELETE ON note_edges BEGIN
+            UPDATE edges SET n = n - OLD.n WHERE a = OLD.a AND b = OLD.b;
+            DELETE FROM edges WHERE a = OLD.a AND b = OLD.b AND n <= 0;
+        END;
+        """)
+        self.conn.commit()
+
+    def _check_window(self):
+        """Edges counted with a different window are stale — drop them so build() re-indexes."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'window'").fetchone()
+        if row is None and not self.is_empty():
+            row = ("2",)  # graphs built before the window existed used adjacent words
+        if row and int(row[0]) == GRAPH_WINDOW:
+            return
+        with self.conn:
+            if row:
+                log.info(f"🕸 Co-occurrence window changed ({row[0]} → {GRAPH_WINDOW}); graph will be rebuilt")
+                self.conn.execute("DELETE FROM note_edges")
+                self.conn.execute("DELETE FROM notes")
+                self._bump_version()
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('window', ?)", (str(GRAPH_WINDOW),))
+
+    def _bump_version(self):
+        self.conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+        self._matrix = None
+
+    def _version(self) -> int:
+        return int(self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+
+    # --- incremental updates -------------------------------------------------
+    def _remove(self, name: str):
+        self.conn.execute("DELETE FROM note_edges WHERE path = ?", (name,))
+        self.conn.execute("DELETE FROM notes WHERE path = ?", (name,))
+        self._bump_version()
+
+    def update_note(self, path: str) -> bool:
+        """Re-index one note if its content changed. Returns True if the graph changed."""
+        name = os.path.basename(path)
+        if not os.path.exists(path):
+            return self.remove_note(path)
+        st = os.stat(path)
+        row = self.conn.execute("SELECT mtime, size, sha256 FROM notes WHERE path = ?", (name,)).fetchone()
+        if row and row[0] == st.st_mtime and row[1] == st.st_size:
+            return False
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        with self.conn:
+            if row and row[2] == digest:
+                self.conn.execute("UPDATE notes SET mtime = ?, size = ? WHERE path = ?", (st.st_mtime, st.st_size, name))
+                return False
+            self._remove(name)
+            edges = note_edges(raw.decode("utf-8", errors="replace"), GRAPH_WINDOW)
+            self.conn.executemany(
+                "INSERT INTO note_edges (path, a, b, n) VALUES (?, ?, ?, ?)",
+                [(name, a, b, n) for (a, b), n in edges.items()],
+            )
+            self.conn.execute(
+                "INSERT INTO notes (path, mtime, size, sha256) VALUES (?, ?, ?, ?)",
+                (name, st.st_mtime, st.st_size, digest),
+            )
+        return True
+
+    def remove_note(self, path: str) -> bool:
+        """Drop a note's edge contributions. Returns True if it was indexed."""
+        name = os.path.basename(path)
+        with self.conn:
+            known = self.conn.execute("SELECT 1 FROM notes WHERE path = ?", (name,)).fetchone()
+            if known:
+                self._remove(name)
+        return bool(known)
 
     def build(self):
+        """Sync the stored graph with the notes directory (only changed notes are re-read)."""
+        seen, changed = set(), 0
         for file in os.listdir(self.notes_dir):
             if file.endswith((".md", ".txt")):
-                text = open(os.path.join(self.notes_dir, file)).read()
-                words = re.findall(r'\b[A-Za-z]{5,}\b', text)
-                for i in range(len(words) - 1):
-                    self.graph.add_edge(words[i].lower(), words[i + 1].lower())
-
-        log.info(f"🕸 Built knowledge graph with {len(self.graph.nodes())} nodes")
-
-    def related(self, concept: str):
-        concept = concept.lower()
-        if concept in self.graph:
-            return list(self.graph.neighbors(concept))
-        else:
-            return []
\ No newline at end of file
+                seen.add(file)
+                changed += self.update_note(os.path.join(self.notes_dir, file))
+
+        known = [row[0] for row in self.conn.execute("SELECT path FROM notes")]
+        removed = sum(self.remove_note(name) for name in known if name not in seen)
+
+        nodes = self.conn.execute("SELECT COUNT(*) FROM (SELECT a FROM edges UNION SELECT b FROM edges)").fetchone()[0]
+        log.info(f"🕸 Knowledge graph synced — {changed} notes updated, {removed} removed, {nodes} nodes")
+
+    # --- queries -------------------------------------------------------------
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM notes LIMIT 1").fetchone() is None
+
+    def matrix(self) -> CooccurrenceMatrix:
+        """CSR view of the stored graph, cached in an .npz file until the graph changes."""
+        version = self._version()
+        if self._matrix is not None and self._matrix.version == version:
+            return self._matrix
+        matrix = None
+        if os.path.exists(self.matrix_path):
+            try:
+                matrix = CooccurrenceMatrix.load(self.matrix_path)
+            except (OSError, KeyError, ValueError):
+                matrix = None
+        if matrix is None or matrix.version != version:
+            rows = self.conn.execute("SELECT a, b, n FROM edges").fetchall()
+            a, b, n = zip(*rows) if rows else ((), (), ())
+            word_df = dict(self.conn.execute("""
+            SELECT word, COUNT(*) FROM (
+                SELECT path, a AS word FROM note_edges UNION SELECT path, b FROM note_edges
+            ) GROUP BY word
+            """))
+            n_notes = self.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+            matrix = CooccurrenceMatrix.from_edges(a, b, n, word_df, n_notes, version)
+            matrix.save(self.matrix_path)
+        self._matrix = matrix
+        return matrix
+
+    def related(self, concept: str, k: int = 10, method: str = "pmi"):
+        """Top-k related concepts as [(word, score)], best first."""
+        return self.related_many([concept], k, method)[0]
+
+    def related_many(self, concepts: list[str], k: int = 10, method: str = "pmi"):
+        """Batch form of related(): one ranked list per concept."""
+        return self.matrix().top_k(concepts, k, method)
+
+    def to_networkx(self):
+        """Materialise the stored graph as a networkx.Graph (edge attribute: weight)."""
+        import networkx as nx
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(self.conn.execute("SELECT a, b, n FROM edges"))
+        return graph
+
+    def close(self):
+        self.conn.close()
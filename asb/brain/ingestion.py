@@ -1,26 +1,167 @@
-from asb.brain.sources.git_adapter import GitAdapter
+import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from asb.brain.sources.git_adapter import GitAdapter, GIT_REPOS
 from asb.brain.sources.files_adapter import FilesAdapter
-from asb.brain.sources.notion_adapter import NotionAdapter
-from asb.brain.memory import Memory
+from asb.brain import services
+from asb.brain.memory import as_timestamp
+
+
+def entry_doc_id(entry: dict) -> str:
+    """Stable id for a source entry: its path / native id, or its content when it has neither."""
+    key = entry.get("path") or entry.get("id") or entry["content"]
+    return f"{entry['source']}_{hashlib.sha1(str(key).encode('utf-8')).hexdigest()[:16]}"
+
 
 class ContextIngestor:
-    def __init__(self):
-        self.memory = Memory()
+    """
+    Pulls entries from every source adapter into vector memory.
+
+    Adapters are fetched concurrently. Entries are keyed by a stable id and a
+    content hash (kept in a manifest next to the notes manifest), so unchanged
+    entries are skipped and edited ones replace their previous chunks.
+    """
 
-    def ingest_all(self):
-        entries = []
-        adapters = [
-            GitAdapter(),
-            FilesAdapter(),
-        ]
-        for adapter in adapters:
-            entries.extend(adapter.fetch_entries())
+    def __init__(self, adapters=None, batch_size: int = 64, max_workers: int = 4):
+        self.memory = services.get_memory()
+        self.adapters = adapters if adapters is not None else self.default_adapters()
+        self.batch_size = batch_size
+        self.max_workers = max_workers
 
-        print(f"📚 Ingested {len(entries)} entries from sources.")
+    @staticmethod
+    def default_adapters() -> list:
+        adapters = [GitAdapter(GIT_REPOS, advance=False), FilesAdapter()]
+        if os.getenv("NOTION_API_KEY") and os.getenv("NOTION_DATABASE_ID"):
+            from asb.brain.sources.notion_adapter import NotionAdapter
+            adapters.append(NotionAdapter(advance=False))
+        return adapters
 
+    @staticmethod
+    def _fetch(adapter):
+        start = time.perf_counter()
+        try:
+            entries = adapter.fetch_entries()
+        except Exception as e:
+            print(f"⚠️ {type(adapter).__name__} failed: {e}")
+            entries = []
+        return entries, time.perf_counter() - start
+
+    def _upsert_entries(self, entries, manifest: dict, stale_ids: list) -> dict:
+        """Upsert new or edited entries; updates `manifest` and collects replaced chunk ids."""
+        counts = {"added": 0, "updated": 0, "skipped": 0}
+        pending = {}
         for e in entries:
-            self.memory.collection.add(
-                documents=[e["content"]],
-                metadatas=[{"source": e["source"]}],
-                ids=[f"{e['source']}_{hash(e['content'])}"],
-            )
\ No newline at end of file
+            content = e.get("content")
+            if not content:
+                counts["skipped"] += 1
+                continue
+            doc_id = entry_doc_id(e)
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            previous = manifest.get(doc_id)
+            if (previous and previous["sha256"] == digest) or doc_id in pending:
+                counts["skipped"] += 1
+                continue
+            counts["updated" if previous else "added"] += 1
+            metadata = {"source": e["source"], "sha256": digest}
+            if e.get("path"):
+                metadata["path"] = e["path"]
+            # Commit / last-edit time, so date filters match when it happened rather than when it was ingested
+            when = e.get("date") or e.get("last_edited")
+            if when:
+                try:
+                    metadata["ts"] = as_timestamp(when)
+                except ValueError:
+                    pass
+            pending[doc_id] = (content, metadata)
+
+        written = self.memory.upsert_documents(
+            ((doc_id, text, metadata) for doc_id, (text, metadata) in pending.items()),
+            batch_size=self.batch_size,
+        )
+        for doc_id, ids in written.items():
+            previous = manifest.get(doc_id)
+            if previous:
+                stale_ids.extend(i for i in previous["ids"] if i not in ids)
+            manifest[doc_id] = {"sha256": pending[doc_id][1]["sha256"], "ids": ids}
+        return counts
+
+    def ingest_all(self) -> dict:
+        """Fetch, diff and upsert every source. Returns {source: {added, updated, skipped, fetch_s, upsert_s}}."""
+        self.forget_relative_file_ids()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            fetched = list(pool.map(self._fetch, self.adapters))
+
+        manifest = self.memory._load_manifest(self.memory.sources_manifest_path)
+        summary = {}
+        stale_ids = []
+        for adapter, (entries, fetch_s) in zip(self.adapters, fetched):
+            name = getattr(adapter, "source", None) or type(adapter).__name__.removesuffix("Adapter").lower()
+            start = time.perf_counter()
+            counts = self._upsert_entries(entries, manifest, stale_ids)
+            upsert_s = time.perf_counter() - start
+            # Incremental adapters (git) only move their cursor once entries are stored
+            if hasattr(adapter, "save_cursor"):
+                adapter.save_cursor()
+
+            summary[name] = {**counts, "fetch_s": fetch_s, "upsert_s": upsert_s}
+            print(f"📦 {name}: {counts['added']} added, {counts['updated']} updated, {counts['skipped']} skipped "
+                  f"(fetch {fetch_s:.2f}s, upsert {upsert_s:.2f}s)")
+
+        if stale_ids:
+            self.memory._delete_batched(stale_ids)
+        self.memory._save_manifest(manifest, self.memory.sources_manifest_path)
+
+        total = sum(len(entries) for entries, _ in fetched)
+        print(f"📚 Ingested {total} entries from {len(self.adapters)} sources.")
+        return summary
+
+    def forget_relative_file_ids(self) -> int:
+        """
+        Drop local files stored under a relative path. Their ids came from the
+        path string as configured, so the same file could be stored twice;
+        FilesAdapter now reports absolute paths and re-adds them. Returns the
+        number of chunks removed.
+        """
+        stored = self.memory.collection.get(where={"source": "local_file"}, include=["metadatas"])
+        stale = [(chunk_id, m.get("parent_id")) for chunk_id, m in zip(stored["ids"], stored["metadatas"])
+                 if m.get("path") and not os.path.isabs(m["path"])]
+        if not stale:
+            return 0
+        manifest = self.memory._load_manifest(self.memory.sources_manifest_path)
+        for _, doc_id in stale:
+            manifest.pop(doc_id, None)
+        self.memory._delete_batched([chunk_id for chunk_id, _ in stale])
+        self.memory._save_manifest(manifest, self.memory.sources_manifest_path)
+        return len(stale)
+
+    def stored_paths(self, adapter: FilesAdapter) -> set[str]:
+        """Paths of the adapter's files that have chunks in memory (including files deleted since)."""
+        folder = os.path.abspath(adapter.path)
+        stored = self.memory.collection.get(where={"source": "local_file"}, include=["metadatas"])
+        return {m["path"] for m in stored["metadatas"]
+                if m.get("path") and os.path.dirname(os.path.abspath(m["path"])) == folder}
+
+    def ingest_files(self, paths, adapter: FilesAdapter = None) -> dict:
+        """
+        Sync individual files of a FilesAdapter folder (created, modified or
+        deleted) without re-reading the rest. Returns {added, updated, skipped, removed}.
+        """
+        adapter = adapter or next((a for a in self.adapters if isinstance(a, FilesAdapter)), FilesAdapter())
+        manifest = self.memory._load_manifest(self.memory.sources_manifest_path)
+        stale_ids, entries, removed = [], [], 0
+        for path in dict.fromkeys(paths):
+            entry = adapter.entry_for(path)
+            if entry:
+                entries.append(entry)
+                continue
+            doc_id = entry_doc_id({"source": "local_file", "path": adapter.path_for(path)})
+            if doc_id in manifest and not os.path.exists(path):
+                stale_ids.extend(manifest.pop(doc_id)["ids"])
+                removed += 1
+
+        counts = self._upsert_entries(entries, manifest, stale_ids)
+        if stale_ids:
+            self.memory._delete_batched(stale_ids)
+        self.memory._save_manifest(manifest, self.memory.sources_manifest_path)
+        return {**counts, "removed": removed}
@@ -1,16 +1,108 @@
 # asb/brain/insight_db.py
-import sqlite3
-import os
-from datetime import datetime
+import re
+import threading
+from datetime import datetime, timedelta
+from asb.brain.utils import open_sqlite
 
 DB_PATH = "./data/insights.db"
 
+
+def _fts_phrase(text: str, prefix: bool = False) -> str:
+    """Quote user text as one FTS5 phrase (optionally a prefix match)."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return '""'
+    return '"' + " ".join(words) + '"' + ("*" if prefix else "")
+
+
+def _fts_terms(text: str) -> str:
+    """Quote every word of user text so FTS5 ANDs them without parsing operators."""
+    return " ".join(f'"{w}"' for w in re.findall(r"\w+", text)) or '""'
+
+
+def _split_tags(tags) -> list[str]:
+    """Normalised, de-duplicated tags from a list or a comma-joined string."""
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return list(dict.fromkeys(t.strip() for t in tags or [] if t and t.strip()))
+
+
+def _bump(table: str, keys: dict, delta: int) -> str:
+    """Trigger statements adding `delta` to a rollup row (dropping it when it reaches 0)."""
+    cols = ", ".join(keys)
+    vals = ", ".join(keys.values())
+    match = " AND ".join(f"{k} = {v}" for k, v in keys.items())
+    if delta > 0:
+        return (f"INSERT INTO {table} ({cols}, n) VALUES ({vals}, {delta}) "
+                f"ON CONFLICT({cols}) DO UPDATE SET n = n + {delta};")
+    return (f"UPDATE {table} SET n = n - {-delta} WHERE {match}; "
+            f"DELETE FROM {table} WHERE {match} AND n <= 0;")
+
+
+def _insight_rollups(row: str, delta: int) -> str:
+    day, topic = f"substr({row}.date, 1, 10)", f"COALESCE({row}.topic, '')"
+    return "\n".join([
+        _bump("insight_daily", {"day": day}, delta),
+        _bump("insight_topic_daily", {"topic": topic, "day": day}, delta),
+        _bump("insight_topics", {"topic": topic}, delta),
+    ])
+
+
+def _tag_rollups(row: str, delta: int) -> str:
+    topic = f"(SELECT COALESCE(topic, '') FROM insights WHERE id = {row}.insight_id)"
+    return "\n".join([
+        _bump("insight_tag_counts", {"tag": f"{row}.tag"}, delta),
+        _bump("insight_topic_tags", {"topic": topic, "tag": f"{row}.tag"}, delta),
+    ])
+
+
+_ROLLUP_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS insights_rollup_ai AFTER INSERT ON insights BEGIN
+    {_insight_rollups("NEW", 1)}
+END;
+-- Tags go first so their topic lookup still finds the insight
+CREATE TRIGGER IF NOT EXISTS insights_rollup_bd BEFORE DELETE ON insights BEGIN
+    DELETE FROM insight_tags WHERE insight_id = OLD.id;
+END;
+CREATE TRIGGER IF NOT EXISTS insights_rollup_ad AFTER DELETE ON insights BEGIN
+    {_insight_rollups("OLD", -1)}
+END;
+CREATE TRIGGER IF NOT EXISTS insights_rollup_au AFTER UPDATE OF date, topic ON insights BEGIN
+    {_insight_rollups("OLD", -1)}
+    {_insight_rollups("NEW", 1)}
+END;
+CREATE TRIGGER IF NOT EXISTS insights_rollup_topic_tags AFTER UPDATE OF topic ON insights
+WHEN OLD.topic IS NOT NEW.topic BEGIN
+    UPDATE insight_topic_tags SET n = n - 1
+    WHERE topic = COALESCE(OLD.topic, '') AND tag IN (SELECT tag FROM insight_tags WHERE insight_id = OLD.id);
+    DELETE FROM insight_topic_tags WHERE topic = COALESCE(OLD.topic, '') AND n <= 0;
+    INSERT INTO insight_topic_tags (topic, tag, n)
+        SELECT COALESCE(NEW.topic, ''), tag, 1 FROM insight_tags WHERE insight_id = NEW.id
+        ON CONFLICT(topic, tag) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS insight_tags_ai AFTER INSERT ON insight_tags BEGIN
+    {_tag_rollups("NEW", 1)}
+END;
+CREATE TRIGGER IF NOT EXISTS insight_tags_ad AFTER DELETE ON insight_tags BEGIN
+    {_tag_rollups("OLD", -1)}
+END;
+"""
+
+
 class InsightDB:
     def __init__(self, db_path: str = DB_PATH):
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.conn = sqlite3.connect(db_path)
+        # Shared process-wide (see services.get_insight_db), so allow use across threads
+        self.conn = open_sqlite(db_path)
+        self.lock = threading.Lock()
+        self._configure()
         self._create_table()
 
+    def _configure(self):
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-32000")  # ~32 MB page cache
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+
     def _create_table(self):
         cursor = self.conn.cursor()
         cursor.execute("""
@@ -23,30 +115,229 @@ class InsightDB:
             tags TEXT
         )
         """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_insights_date ON insights(date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_insights_topic ON insights(topic, date)")
+
+        fts_exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'insights_fts'"
+        ).fetchone()
+        cursor.executescript("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS insights_fts USING fts5(
+            topic, question, answer, tags,
+            content='insights', content_rowid='id', tokenize='porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS insights_ai AFTER INSERT ON insights BEGIN
+            INSERT INTO insights_fts(rowid, topic, question, answer, tags)
+            VALUES (new.id, new.topic, new.question, new.answer, new.tags);
+        END;
+        CREATE TRIGGER IF NOT EXISTS insights_ad AFTER DELETE ON insights BEGIN
+            INSERT INTO insights_fts(insights_fts, rowid, topic, question, answer, tags)
+            VALUES ('delete', old.id, old.topic, old.question, old.answer, old.tags);
+        END;
+        CREATE TRIGGER IF NOT EXISTS insights_au AFTER UPDATE ON insights BEGIN
+            INSERT INTO insights_fts(insights_fts, rowid, topic, question, answer, tags)
+            VALUES ('delete', old.id, old.topic, old.question, old.answer, old.tags);
+            INSERT INTO insights_fts(rowid, topic, question, answer, tags)
+            VALUES (new.id, new.topic, new.question, new.answer, new.tags);
+        END;
+        """)
+        if not fts_exists:
+            # Index insights written before full-text search existed
+            cursor.execute("INSERT INTO insights_fts(insights_fts) VALUES ('rebuild')")
+
+        # Bumped by every write, so readers (the dashboard) can cache until it changes
+        cursor.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+        CREATE TRIGGER IF NOT EXISTS insights_version_ai AFTER INSERT ON insights BEGIN
+            UPDATE meta SET value = value + 1 WHERE key = 'version';
+        END;
+        CREATE TRIGGER IF NOT EXISTS insights_version_ad AFTER DELETE ON insights BEGIN
+            UPDATE meta SET value = value + 1 WHERE key = 'version';
+        END;
+        CREATE TRIGGER IF NOT EXISTS insights_version_au AFTER UPDATE ON insights BEGIN
+            UPDATE meta SET value = value + 1 WHERE key = 'version';
+        END;
+        """)
+        self._create_rollups(cursor)
         self.conn.commit()
 
+    def _create_rollups(self, cursor):
+        """
+        Normalised tags plus per-day / per-topic / per-tag counts.
+
+        Tag rows are written by add_insights (SQLite triggers can't split
+        strings); every count table is maintained by triggers, so analytics
+        read a handful of rollup rows instead of scanning insights.
+        """
+        exists = cursor.execute("SELECT value FROM meta WHERE key = 'rollups'").fetchone()
+        cursor.executescript(f"""
+        CREATE TABLE IF NOT EXISTS insight_tags (
+            insight_id INTEGER NOT NULL,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (tag, insight_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_insight_tags_insight ON insight_tags(insight_id);
+
+        CREATE TABLE IF NOT EXISTS insight_daily (
+            day TEXT PRIMARY KEY, n INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS insight_topic_daily (
+            topic TEXT NOT NULL, day TEXT NOT NULL, n INTEGER NOT NULL, PRIMARY KEY (topic, day)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS insight_topics (
+            topic TEXT PRIMARY KEY, n INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS insight_tag_counts (
+            tag TEXT PRIMARY KEY, n INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS insight_topic_tags (
+            topic TEXT NOT NULL, tag TEXT NOT NULL, n INTEGER NOT NULL, PRIMARY KEY (topic, tag)
+        ) WITHOUT ROWID;
+
+        {_ROLLUP_TRIGGERS}
+        """)
+        if not exists:
+            self._backfill_rollups(cursor)
+            cursor.execute("INSERT INTO meta (key, value) VALUES ('rollups', 1)")
+
+    def _backfill_rollups(self, cursor):
+        """Populate tags and rollups for insights written before they existed."""
+        rows = cursor.execute("SELECT id, tags FROM insights WHERE tags IS NOT NULL AND tags != ''").fetchall()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO insight_tags (insight_id, tag) VALUES (?, ?)",
+            [(insight_id, tag) for insight_id, tags in rows for tag in _split_tags(tags)],
+        )
+        # The tag triggers filled the tag counts; the insight-level ones need a one-off aggregate
+        cursor.executescript("""
+        INSERT INTO insight_daily (day, n)
+            SELECT substr(date, 1, 10), COUNT(*) FROM insights GROUP BY 1;
+        INSERT INTO insight_topic_daily (topic, day, n)
+            SELECT COALESCE(topic, ''), substr(date, 1, 10), COUNT(*) FROM insights GROUP BY 1, 2;
+        INSERT INTO insight_topics (topic, n)
+            SELECT COALESCE(topic, ''), COUNT(*) FROM insights GROUP BY 1;
+        """)
+
     def add_insight(self, topic: str, question: str, answer: str, tags: list[str] = None):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        INSERT INTO insights (date, topic, question, answer, tags)
-        VALUES (?, ?, ?, ?, ?)
-        """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), topic, question, answer, ",".join(tags or [])))
-        self.conn.commit()
+        self.add_insights([(topic, question, answer, tags)])
 
-    def query_by_topic(self, topic: str):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        SELECT date, question, answer, tags
-        FROM insights
-        WHERE topic LIKE ?
-        ORDER BY date DESC
-        """, (f"%{topic}%",))
-        return cursor.fetchall()
+    def add_insights(self, insights) -> int:
+        """Insert (topic, question, answer, tags) tuples in a single transaction."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [(topic, question, answer, _split_tags(tags)) for topic, question, answer, tags in insights]
+        if not rows:
+            return 0
+        with self.lock, self.conn:
+            tag_rows = []
+            for topic, question, answer, tags in rows:
+                cursor = self.conn.execute("""
+                INSERT INTO insights (date, topic, question, answer, tags)
+                VALUES (?, ?, ?, ?, ?)
+                """, (now, topic, question, answer, ",".join(tags)))
+                tag_rows.extend((cursor.lastrowid, tag) for tag in tags)
+            self.conn.executemany("INSERT INTO insight_tags (insight_id, tag) VALUES (?, ?)", tag_rows)
+        return len(rows)
+
+    def query_by_topic(self, topic: str, limit: int = None):
+        """Insights whose topic contains the given words (prefix match on the last one), newest first."""
+        # Dates are assigned at insert time, so rowid order is date order and
+        # FTS5 can walk it backwards, stopping as soon as LIMIT is reached.
+        sql = """
+        SELECT i.date, i.question, i.answer, i.tags
+        FROM insights_fts JOIN insights i ON i.id = insights_fts.rowid
+        WHERE insights_fts MATCH ?
+        ORDER BY insights_fts.rowid DESC
+        """
+        params = [f"topic : {_fts_phrase(topic, prefix=True)}"]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def search(self, query: str, limit: int = 10):
+        """
+        Ranked full-text search over question, answer and tags.
+
+        Returns (date, topic, question, answer snippet, tags, score) rows,
+        best match first (lower bm25 score is better).
+        """
+        match = f"{{question answer tags}} : ({_fts_terms(query)})"
+        with self.lock:
+            return self.conn.execute("""
+            SELECT i.date, i.topic, i.question,
+                   snippet(insights_fts, 2, '[', ']', '…', 24),
+                   i.tags, bm25(insights_fts, 0.0, 4.0, 1.0, 2.0) AS score
+            FROM insights_fts JOIN insights i ON i.id = insights_fts.rowid
+            WHERE insights_fts MATCH ?
+            ORDER BY score
+            LIMIT ?
+            """, (match, limit)).fetchall()
+
+    def version(self) -> int:
+        """Counter that changes whenever an insight is added, edited or deleted."""
+        with self.lock:
+            return self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    # --- aggregates (read from trigger-maintained rollups) ---------------------
+    def count(self, topic: str = None) -> int:
+        with self.lock:
+            if topic is None:
+                row = self.conn.execute("SELECT SUM(n) FROM insight_topics").fetchone()
+            else:
+                row = self.conn.execute("SELECT n FROM insight_topics WHERE topic = ?", (topic,)).fetchone()
+        return (row[0] or 0) if row else 0
+
+    def page(self, topic: str = None, limit: int = 20, offset: int = 0):
+        """One page of (id, date, topic, question, answer, tags) rows, newest first."""
+        where, params = ("WHERE topic = ?", (topic,)) if topic else ("", ())
+        with self.lock:
+            return self.conn.execute(f"""
+            SELECT id, date, topic, question, answer, tags FROM insights {where}
+            ORDER BY id DESC LIMIT ? OFFSET ?
+            """, (*params, limit, offset)).fetchall()
+
+    def daily_counts(self, topic: str = None, days: int = None):
+        """[(day, insights)] oldest first, optionally for one topic and/or the last `days` days."""
+        sql, params = ("SELECT day, n FROM insight_daily", []) if topic is None else \
+            ("SELECT day, n FROM insight_topic_daily WHERE topic = ?", [topic])
+        if days is not None:
+            sql += (" AND" if topic is not None else " WHERE") + " day >= ?"
+            params.append((datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d"))
+        with self.lock:
+            return self.conn.execute(sql + " ORDER BY day", params).fetchall()
+
+    def topic_counts(self, limit: int = 10):
+        """[(topic, insights)] most frequent first."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT topic, n FROM insight_topics WHERE topic != '' ORDER BY n DESC, topic LIMIT ?", (limit,)
+            ).fetchall()
+
+    def tag_counts(self, topic: str = None, limit: int = 15):
+        """[(tag, insights)] most frequent first, optionally within one topic."""
+        with self.lock:
+            if topic is None:
+                return self.conn.execute(
+                    "SELECT tag, n FROM insight_tag_counts ORDER BY n DESC, tag LIMIT ?", (limit,)
+                ).fetchall()
+            return self.conn.execute(
+                "SELECT tag, n FROM insight_topic_tags WHERE topic = ? ORDER BY n DESC, tag LIMIT ?", (topic, limit)
+            ).fetchall()
+
+    def by_tag(self, tag: str, limit: int = 20):
+        """(date, topic, question, answer, tags) rows carrying `tag`, newest first."""
+        with self.lock:
+            return self.conn.execute("""
+            SELECT i.date, i.topic, i.question, i.answer, i.tags
+            FROM insight_tags t JOIN insights i ON i.id = t.insight_id
+            WHERE t.tag = ? ORDER BY t.insight_id DESC LIMIT ?
+            """, (tag, limit)).fetchall()
 
     def list_topics(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT DISTINCT topic FROM insights")
-        return [row[0] for row in cursor.fetchall()]
+        with self.lock:
+            cursor = self.conn.execute("SELECT topic FROM insight_topics")
+            return [row[0] or None for row in cursor.fetchall()]
 
     def close(self):
-        self.conn.close()
\ No newline at end of file
+        self.conn.close()
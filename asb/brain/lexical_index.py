@@ -0,0 +1,122 @@
+# asb/brain/lexical_index.py
+import re
+import threading
+from asb.brain.utils import open_sqlite
+
+# SQLite caps the number of bound parameters per statement
+_DELETE_CHUNK = 500
+
+
+def fts_any(text: str) -> str:
+    """Quote every word of user text and OR them, so BM25 ranks partial matches too."""
+    words = list(dict.fromkeys(re.findall(r"\w+", text)))
+    return " OR ".join(f'"{w}"' for w in words)
+
+
+class LexicalIndex:
+    """
+    BM25 keyword index over the chunks stored in vector memory.
+
+    Lives next to the Chroma collection and is written by the same upserts /
+    deletes, so exact terms (commit hashes, names, error strings) that dense
+    embeddings blur can still be found. `source` and `ts` (unix time) are
+    kept as plain indexed columns so filters apply inside the search.
+
+    Every write also bumps a version counter in the same database, which
+    lets each process tell whether memory changed since it last looked.
+    """
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = open_sqlite(path)
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS chunks (
+            rid INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            source TEXT,
+            ts REAL,
+            text TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_chunks_source_ts ON chunks(source, ts);
+        CREATE INDEX IF NOT EXISTS idx_chunks_ts ON chunks(ts);
+        CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+            text, content='chunks', content_rowid='rid', tokenize='porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+            INSERT INTO chunks_fts(rowid, text) VALUES (new.rid, new.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+            INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES ('delete', old.rid, old.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
+            INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES ('delete', old.rid, old.text);
+            INSERT INTO chunks_fts(rowid, text) VALUES (new.rid, new.text);
+        END;
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+        """)
+        self.conn.commit()
+
+    def _bump_version(self):
+        self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def version(self) -> int:
+        """Write counter shared by every process using this index (one cheap read)."""
+        with self.lock:
+            return self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def ids_without_ts(self) -> list[str]:
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT id FROM chunks WHERE ts IS NULL")]
+
+    def upsert(self, ids: list[str], texts: list[str], metadatas: list[dict]):
+        rows = [(i, (m or {}).get("source"), (m or {}).get("ts"), t) for i, t, m in zip(ids, texts, metadatas)]
+        with self.lock, self.conn:
+            self.conn.executemany("""
+            INSERT INTO chunks (id, source, ts, text) VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET source = excluded.source, ts = excluded.ts, text = excluded.text
+            """, rows)
+            self._bump_version()
+
+    def delete(self, ids: list[str]):
+        with self.lock, self.conn:
+            for i in range(0, len(ids), _DELETE_CHUNK):
+                batch = ids[i:i + _DELETE_CHUNK]
+                self.conn.execute(f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(batch))})", batch)
+            self._bump_version()
+
+    def search(self, query: str, limit: int = 10, source: str = None,
+               since: float = None, until: float = None) -> list[tuple]:
+        """[(chunk id, text, bm25 score)] best first (lower score is better)."""
+        match = fts_any(query)
+        if not match:
+            return []
+        sql = """
+        SELECT c.id, c.text, bm25(chunks_fts) AS score
+        FROM chunks_fts JOIN chunks c ON c.rid = chunks_fts.rowid
+        WHERE chunks_fts MATCH ?
+        """
+        params = [match]
+        if source is not None:
+            sql += " AND c.source = ?"
+            params.append(source)
+        if since is not None:
+            sql += " AND c.ts >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND c.ts <= ?"
+            params.append(until)
+        with self.lock:
+            return self.conn.execute(sql + " ORDER BY score LIMIT ?", (*params, limit)).fetchall()
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM chunks")
+            self._bump_version()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,122 @@
+# asb/brain/llm_cache.py
+import os
+import json
+import time
+import hashlib
+import threading
+from dotenv import load_dotenv
+from asb.brain.utils import open_sqlite
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "0").lower() in ("1", "true", "yes", "on")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./data/cache/llm_responses.db")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+LLM_CACHE_MAX = int(os.getenv("LLM_CACHE_MAX", "5000"))
+
+
+def llm_params_of(llm) -> dict:
+    """Model name and generation parameters of a LangChain LLM (part of the cache key)."""
+    params = getattr(llm, "_identifying_params", None)
+    if isinstance(params, dict) and params:
+        return params
+    return {"model": getattr(llm, "model", None) or type(llm).__name__}
+
+
+def response_key(params: dict, template: str, query: str, context) -> str:
+    """
+    Cache key for one generation: (model + params, prompt template, query,
+    hash of the retrieved context).
+    """
+    context_hash = hashlib.sha256("\x1e".join(context).encode("utf-8")).hexdigest()
+    payload = json.dumps(
+        [params, hashlib.sha256(template.encode("utf-8")).hexdigest(), query, context_hash],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of LLM answers.
+
+    Entries expire `ttl` seconds after they were generated; past
+    `max_entries`, the least recently used answers are evicted.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL, max_entries: int = LLM_CACHE_MAX):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = open_sqlite(path)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str):
+        """Return the cached answer, or None on a miss (expired entries count as misses)."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl:
+                self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                self.conn.commit()
+                self.hits += 1
+                return row[0]
+            if row:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                self.size -= 1
+            self.misses += 1
+        return None
+
+    def put(self, key: str, response: str, model: str = None):
+        now = time.time()
+        with self.lock:
+            before = self.conn.total_changes
+            exists = self.conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            if not exists:
+                self.size += self.conn.total_changes - before
+            if self.size > self.max_entries:
+                self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now: float):
+        self.conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        overflow = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self.conn.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_used LIMIT ?
+            )
+            """, (overflow,))
+        self.size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": self.size}
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+            self.size = 0
+
+    def close(self):
+        self.conn.close()
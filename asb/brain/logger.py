@@ -13,11 +13,13 @@ def setup_logger(log_dir="./data/logs"):
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
-    # Also print to console
-    console = logging.StreamHandler()
-    console.setLevel(logging.INFO)
-    console.setFormatter(logging.Formatter("%(message)s"))
-    logging.getLogger().addHandler(console)
-
-    logging.info("🧠 ASB logging initialized.")
-    return logging.getLogger()
\ No newline at end of file
+    # Also print to console (once, however many modules call this)
+    root = logging.getLogger()
+    if not any(getattr(h, "_asb_console", False) for h in root.handlers):
+        console = logging.StreamHandler()
+        console.setLevel(logging.INFO)
+        console.setFormatter(logging.Formatter("%(message)s"))
+        console._asb_console = True
+        root.addHandler(console)
+        logging.info("🧠 ASB logging initialized.")
+    return root
\ No newline at end of file
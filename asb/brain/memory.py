@@ -1,49 +1,455 @@
 # asb/brain/memory.py
 import os
-import subprocess
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
 import chromadb
 from dotenv import load_dotenv
-from asb.brain.embeddings import get_embedding_model
+from asb.brain import services
+from asb.brain.chunker import iter_chunks
+from asb.brain.embedding_cache import model_name_of
+from asb.brain.lexical_index import LexicalIndex
+from asb.brain.utils import load_json, save_json
 
 load_dotenv()
 
-def is_ollama_running() -> bool:
-    """Check if Ollama server is running locally."""
-    try:
-        result = subprocess.run(
-            ["ollama", "list"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=2
-        )
-        return result.returncode == 0
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        return False
+NOTE_EXTENSIONS = (".md", ".txt")
+# Reciprocal-rank fusion constant: larger values flatten the head of each ranking
+RRF_K = int(os.getenv("RRF_K", "60"))
+# Candidates taken from each retriever per requested result before fusing
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "4"))
+# Recent query results kept in memory per Memory instance (0 disables)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "256"))
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def as_timestamp(value, end_of_day: bool = False) -> float:
+    """
+    Unix time of a number, datetime, date or ISO-8601 string (e.g. "2024-05-01",
+    git / Notion dates). A bare date means its midnight, or its last instant
+    with `end_of_day` (so an "until" date includes that whole day).
+    Raises ValueError for strings that are not ISO dates.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        text = value.strip().replace("Z", "+00:00")
+        try:
+            value = date.fromisoformat(text)
+        except ValueError:
+            value = datetime.fromisoformat(text)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if end_of_day:
+        return datetime(value.year, value.month, value.day, 23, 59, 59, 999999).timestamp()
+    return datetime(value.year, value.month, value.day).timestamp()
+
+
+def chroma_where(filters: dict = None):
+    """Chroma `where` clause for {"source", "since", "until"} filters (None when unfiltered)."""
+    filters = filters or {}
+    clauses = []
+    if filters.get("source") is not None:
+        clauses.append({"source": filters["source"]})
+    if filters.get("since") is not None:
+        clauses.append({"ts": {"$gte": as_timestamp(filters["since"])}})
+    if filters.get("until") is not None:
+        clauses.append({"ts": {"$lte": as_timestamp(filters["until"], end_of_day=True)}})
+    if len(clauses) > 1:
+        return {"$and": clauses}
+    return clauses[0] if clauses else None
+
+
+def rrf_fuse(rankings, k: int = RRF_K) -> list[tuple[str, float]]:
+    """Reciprocal-rank fusion of several best-first id lists → [(id, score)] best first."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class ChromaEmbeddingFunction(chromadb.EmbeddingFunction):
+    """Expose a (cached) LangChain embedder as the collection's embedding function."""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+
+    def __call__(self, input):
+        return self.embedder.embed_documents(list(input))
 
 
 class Memory:
-    def __init__(self):
-        self.client = chromadb.Client()
-        self.collection = self.client.get_or_create_collection("asb_memory")
-        self.data_dir = os.getenv("DATA_DIR", "./data/notes")
+    """
+    Persistent semantic memory: chunked documents in a Chroma collection plus
+    a BM25 index of the same chunks (LexicalIndex).
 
-        self.embedding_model = get_embedding_model()
+    query() runs both retrievers and merges them with reciprocal-rank fusion,
+    so paraphrases are found by the embeddings and exact terms (hashes, names,
+    error strings) by the keyword index. Every chunk carries `source` and a
+    `ts` (unix time of the underlying note / commit / page), which `filters`
+    restrict on inside both searches. query_many() embeds and searches a
+    batch of questions at once, and recent results are served from an LRU
+    that is dropped whenever the keyword index's write version moves, so
+    writes from other processes (watcher, daemon, dashboard) are seen too.
+    """
 
-    def ingest_notes(self):
-        for file in os.listdir(self.data_dir):
-            if file.endswith(".md") or file.endswith(".txt"):
-                path = os.path.join(self.data_dir, file)
-                with open(path, "r") as f:
-                    content = f.read()
-                self.collection.add(
-                    documents=[content],
-                    ids=[file]
-                )
-        print("✅ Notes ingested into memory")
-
-    def query(self, text, top_k=3):
-        results = self.collection.query(
-            query_texts=[text],
-            n_results=top_k
+    def __init__(self, data_dir: str = None, vector_dir: str = None, batch_size: int = 64,
+                 embedding_model=None, query_cache_size: int = QUERY_CACHE_SIZE):
+        self.data_dir = data_dir or os.getenv("DATA_DIR", "./data/notes")
+        self.vector_dir = vector_dir or os.getenv("VECTOR_DIR", "./data/vector_store")
+        os.makedirs(self.vector_dir, exist_ok=True)
+        self.batch_size = batch_size
+
+        self.embedding_model = embedding_model or services.get_embedder()
+
+        # Persistent store: survives across CLI invocations. Vectors from
+        # different embedders have different dimensions, so each model
+        # gets its own collection (and its own notes manifest).
+        model_slug = re.sub(r"[^A-Za-z0-9]+", "_", model_name_of(self.embedding_model)).strip("_")
+        collection_name = f"asb_memory_{model_slug}"[:63].rstrip("_")
+        self.client = chromadb.PersistentClient(path=self.vector_dir)
+        self.collection = self.client.get_or_create_collection(
+            collection_name,
+            embedding_function=ChromaEmbeddingFunction(self.embedding_model),
         )
-        return results["documents"][0]
\ No newline at end of file
+        self.manifest_path = os.path.join(self.vector_dir, f"{collection_name}_manifest.json")
+        # Same idea for entries from external sources (see ContextIngestor)
+        self.sources_manifest_path = os.path.join(self.vector_dir, f"{collection_name}_sources.json")
+        # LRU of search results, valid for one write version of the store (see search_many)
+        self.query_cache_size = query_cache_size
+        self._query_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_version = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.lexical = LexicalIndex(os.path.join(self.vector_dir, f"{collection_name}_bm25.db"))
+        if not self.lexical.count() and self.collection.count():
+            self.rebuild_lexical_index()
+        self.backfill_timestamps()
+
+    # --- manifest ------------------------------------------------------------
+    def _load_manifest(self, path: str = None) -> dict:
+        # A missing or corrupt manifest only costs one full re-ingest
+        return load_json(path or self.manifest_path)
+
+    def _save_manifest(self, manifest: dict, path: str = None):
+        save_json(path or self.manifest_path, manifest, indent=1, sort_keys=True)
+
+    def _scan_notes(self):
+        """Yield (name, path, stat) for every note file in the data dir."""
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(NOTE_EXTENSIONS):
+                    yield entry.name, entry.path, entry.stat()
+
+    # --- batched writes ------------------------------------------------------
+    def _delete_batched(self, ids: list[str]):
+        for i in range(0, len(ids), self.batch_size):
+            self.collection.delete(ids=ids[i:i + self.batch_size])
+        self.lexical.delete(ids)
+        self._invalidate()
+
+    def rebuild_lexical_index(self):
+        """Re-create the BM25 index from the vector collection (e.g. for stores written before it existed)."""
+        self.lexical.clear()
+        offset = 0
+        while True:
+            page = self.collection.get(include=["documents", "metadatas"], limit=1000, offset=offset)
+            if not page["ids"]:
+                break
+            self.lexical.upsert(page["ids"], page["documents"], page["metadatas"])
+            offset += len(page["ids"])
+        self._invalidate()
+        print(f"🔎 Keyword index rebuilt over {offset} chunks")
+
+    def backfill_timestamps(self) -> int:
+        """
+        Stamp a `ts` on chunks stored before chunks carried one, so date
+        filters don't silently skip them. Notes get their manifest mtime;
+        other sources the time their manifest was last written (about when
+        they were ingested). Returns the number of chunks stamped.
+        """
+        ids = self.lexical.ids_without_ts()
+        if not ids:
+            return 0
+        notes = self._load_manifest()
+
+        def written_at(path):
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return time.time()
+
+        notes_ts, sources_ts = written_at(self.manifest_path), written_at(self.sources_manifest_path)
+        stamped = 0
+        for i in range(0, len(ids), self.batch_size):
+            batch = ids[i:i + self.batch_size]
+            page = self.collection.get(ids=batch, include=["documents", "metadatas"])
+            metadatas = []
+            for metadata in page["metadatas"]:
+                metadata = dict(metadata or {})
+                if metadata.get("source") == "notes":
+                    metadata["ts"] = notes.get(metadata.get("path"), {}).get("mtime", notes_ts)
+                else:
+                    metadata["ts"] = sources_ts
+                metadatas.append(metadata)
+            if page["ids"]:
+                self.collection.update(ids=page["ids"], metadatas=metadatas)
+                self.lexical.upsert(page["ids"], page["documents"], metadatas)
+            # Keyword rows whose chunk is gone from the collection
+            orphans = set(batch) - set(page["ids"])
+            if orphans:
+                self.lexical.delete(list(orphans))
+            stamped += len(page["ids"])
+        self._invalidate()
+        print(f"🕰️ Dated {stamped} chunks stored before timestamps were recorded")
+        return stamped
+
+    def upsert_documents(self, documents, batch_size: int = None) -> dict:
+        """
+        Chunk and upsert an iterable of (doc_id, text, metadata) triples.
+
+        Documents are streamed through the chunker and written in batches of
+        `batch_size` chunks (default: the instance's) to both the vector
+        collection and the keyword index. Metadata without a `ts` is stamped
+        with the current time. Returns {doc_id: [chunk ids]}.
+        """
+        batch_size = batch_size or self.batch_size
+        chunk_ids = {}
+        ids, texts, metadatas = [], [], []
+
+        def flush():
+            if ids:
+                self.collection.upsert(ids=ids[:], documents=texts[:], metadatas=metadatas[:])
+                self.lexical.upsert(ids, texts, metadatas)
+                self._invalidate()
+                ids.clear()
+                texts.clear()
+                metadatas.clear()
+
+        now = time.time()
+        for doc_id, text, metadata in documents:
+            metadata = {"ts": now, **metadata}
+            chunk_ids[doc_id] = []
+            for chunk in iter_chunks(text, doc_id):
+                chunk_ids[doc_id].append(chunk["id"])
+                ids.append(chunk["id"])
+                texts.append(chunk["text"])
+                metadatas.append({
+                    **metadata,
+                    "parent_id": doc_id,
+                    "chunk": chunk["index"],
+                    "start": chunk["start"],
+                    "end": chunk["end"],
+                })
+                if len(ids) >= batch_size:
+                    flush()
+        flush()
+        return chunk_ids
+
+    # --- ingestion -----------------------------------------------------------
+    def _sync_notes(self, manifest: dict, candidates, counts: dict) -> list[str]:
+        """
+        Upsert the changed notes among `candidates` ((name, path, stat) triples).
+
+        Updates `manifest` in place and returns the chunk ids that are now stale.
+        """
+        stale_ids = []
+        written_from = {}
+
+        def changed_notes():
+            for name, path, st in candidates:
+                previous = manifest.get(name)
+                if previous and previous["mtime"] == st.st_mtime and previous["size"] == st.st_size:
+                    counts["unchanged"] += 1
+                    continue
+
+                with open(path, "rb") as f:
+                    raw = f.read()
+                digest = _sha256(raw)
+
+                if previous and previous["sha256"] == digest:
+                    # Touched but not edited — refresh the stat only
+                    manifest[name] = {**previous, "mtime": st.st_mtime, "size": st.st_size}
+                    counts["unchanged"] += 1
+                    continue
+
+                counts["updated" if previous else "added"] += 1
+                written_from[name] = previous
+                manifest[name] = {"mtime": st.st_mtime, "size": st.st_size, "sha256": digest, "ids": []}
+                yield name, raw.decode("utf-8", errors="replace"), {
+                    "source": "notes", "path": name, "sha256": digest, "ts": st.st_mtime,
+                }
+
+        written = self.upsert_documents(changed_notes())
+        for name, ids in written.items():
+            previous = written_from.get(name)
+            if previous:
+                stale_ids.extend(i for i in previous["ids"] if i not in ids)
+            manifest[name]["ids"] = ids
+        return stale_ids
+
+    def ingest_notes(self):
+        """
+        Incrementally sync DATA_DIR into the vector store.
+
+        Only notes whose size/mtime changed are re-read, and only those whose
+        content hash changed are re-chunked and re-embedded. Vectors of deleted
+        notes are removed.
+        """
+        manifest = self._load_manifest()
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        seen = []
+
+        def scanned():
+            for name, path, st in self._scan_notes():
+                seen.append(name)
+                yield name, path, st
+
+        stale_ids = self._sync_notes(manifest, scanned(), counts)
+
+        removed = set(manifest) - set(seen)
+        for name in removed:
+            stale_ids.extend(manifest.pop(name)["ids"])
+        counts["removed"] = len(removed)
+
+        if stale_ids:
+            self._delete_batched(stale_ids)
+        self._save_manifest(manifest)
+
+        print(f"✅ Notes ingested into memory — {counts['added']} added, {counts['updated']} updated, "
+              f"{counts['removed']} removed, {counts['unchanged']} unchanged")
+        return counts
+
+    def ingest_paths(self, paths) -> dict:
+        """
+        Sync only the given note files (created, modified or deleted) without
+        rescanning DATA_DIR. Paths outside DATA_DIR or with other extensions are ignored.
+        """
+        manifest = self._load_manifest()
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        notes_dir = os.path.abspath(self.data_dir)
+        candidates, stale_ids = [], []
+        for path in dict.fromkeys(paths):
+            name = os.path.basename(path)
+            if os.path.dirname(os.path.abspath(path)) != notes_dir or not name.endswith(NOTE_EXTENSIONS):
+                continue
+            try:
+                candidates.append((name, path, os.stat(path)))
+            except FileNotFoundError:
+                if name in manifest:
+                    stale_ids.extend(manifest.pop(name)["ids"])
+                    counts["removed"] += 1
+
+        stale_ids += self._sync_notes(manifest, candidates, counts)
+        if stale_ids:
+            self._delete_batched(stale_ids)
+        self._save_manifest(manifest)
+        return counts
+
+    # --- retrieval ---------------------------------------------------------------
+    def version(self) -> int:
+        """Write version of this memory store, bumped by every upsert / delete from any process."""
+        return self.lexical.version()
+
+    def _invalidate(self):
+        """Forget cached query results (writes also move version(), which does the same on the next lookup)."""
+        with self._cache_lock:
+            self._query_cache.clear()
+
+    def _search_uncached(self, texts: list[str], top_k: int, filters: dict, mode: str) -> list[list[dict]]:
+        n = top_k if mode != "hybrid" else max(top_k * HYBRID_CANDIDATES, 20)
+        documents = [{} for _ in texts]
+        rankings = [[] for _ in texts]
+
+        if mode in ("hybrid", "vector"):
+            # One embedding call and one vector search for the whole batch
+            embeddings = self.embedding_model.embed_documents(list(texts))
+            results = self.collection.query(query_embeddings=embeddings, n_results=n, where=chroma_where(filters))
+            if mode == "vector":
+                return [[{"id": i, "document": doc, "score": -d} for i, doc, d in zip(ids, docs, dists)]
+                        for ids, docs, dists in zip(results["ids"], results["documents"], results["distances"])]
+            for q, (ids, docs) in enumerate(zip(results["ids"], results["documents"])):
+                documents[q].update(zip(ids, docs))
+                rankings[q].append(ids)
+
+        since, until = as_timestamp(filters.get("since")), as_timestamp(filters.get("until"), end_of_day=True)
+        out = []
+        for q, text in enumerate(texts):
+            hits = self.lexical.search(text, n, source=filters.get("source"), since=since, until=until)
+            if mode == "lexical":
+                out.append([{"id": i, "document": d, "score": -score} for i, d, score in hits])
+                continue
+            for chunk_id, document, _ in hits:
+                documents[q].setdefault(chunk_id, document)
+            rankings[q].append([chunk_id for chunk_id, _, _ in hits])
+            out.append([{"id": i, "document": documents[q][i], "score": score}
+                        for i, score in rrf_fuse(rankings[q])[:top_k]])
+        return out
+
+    def search_many(self, texts, top_k: int = 3, filters: dict = None, mode: str = "hybrid") -> list[list[dict]]:
+        """
+        search() for several texts at once, in input order.
+
+        Results of recent calls are served from an in-memory LRU, which is
+        dropped when version() has moved since it was filled; the remaining
+        texts are embedded in a single batch and searched in one vector query.
+        """
+        if mode not in ("hybrid", "vector", "lexical"):
+            raise ValueError(f"Unknown retrieval mode: {mode!r}")
+        texts = list(texts)
+        filters = filters or {}
+        filters_key = tuple(sorted((k, str(v)) for k, v in filters.items() if v is not None))
+        keys = [(text, top_k, filters_key, mode) for text in texts]
+
+        found = {}
+        version = self.version()
+        with self._cache_lock:
+            if version != self._cache_version:
+                self._query_cache.clear()
+                self._cache_version = version
+            for key in dict.fromkeys(keys):
+                if key in self._query_cache:
+                    self._query_cache.move_to_end(key)
+                    found[key] = self._query_cache[key]
+                    self.cache_hits += 1
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+
+        if missing:
+            computed = self._search_uncached([key[0] for key in missing], top_k, filters, mode)
+            found.update(zip(missing, computed))
+            # Skip caching if the store changed while we were searching
+            unchanged = self.version() == version
+            with self._cache_lock:
+                self.cache_misses += len(missing)
+                if self.query_cache_size and unchanged and version == self._cache_version:
+                    for key in missing:
+                        self._query_cache[key] = found[key]
+                    while len(self._query_cache) > self.query_cache_size:
+                        self._query_cache.popitem(last=False)
+        return [[dict(hit) for hit in found[key]] for key in keys]
+
+    def search(self, text: str, top_k: int = 3, filters: dict = None, mode: str = "hybrid") -> list[dict]:
+        """
+        Ranked chunks for `text`: [{"id", "document", "score"}] best first.
+
+        `filters` may hold "source" and a "since" / "until" date range (see
+        as_timestamp). `mode` is "hybrid" (RRF of both retrievers), "vector"
+        or "lexical".
+        """
+        return self.search_many([text], top_k, filters, mode)[0]
+
+    def query(self, text, top_k=3, filters: dict = None):
+        """Documents of the `top_k` best chunks for `text` (hybrid search, see search())."""
+        return [hit["document"] for hit in self.search(text, top_k, filters)]
+
+    def query_many(self, texts, top_k=3, filters: dict = None) -> list[list[str]]:
+        """query() for several texts: one embedding batch and one vector search, in input order."""
+        return [[hit["document"] for hit in hits] for hits in self.search_many(texts, top_k, filters)]
@@ -1,17 +1,126 @@
 import os
 import glob
+import hashlib
+import threading
 from datetime import datetime, timedelta
-from asb.brain.agent import ASBAgent
-from asb.brain.insight_db import InsightDB
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from asb.brain import services
+from asb.brain.chunker import count_tokens, iter_chunks
+from asb.brain.utils import load_json, save_json
+
+load_dotenv()
+
+# Upper bound on the text sent to the LLM in one summarisation call
+COMPRESS_GROUP_TOKENS = int(os.getenv("COMPRESS_GROUP_TOKENS", "3000"))
+
+MAP_PROMPT = """Summarize the following reflections into key insights, themes, and lessons.
+Keep concrete facts, decisions and open questions; drop repetition.
+
+{text}"""
+
+REDUCE_PROMPT = """The following are summaries of earlier reflections.
+Merge them into one summary of key insights, themes, and lessons, removing overlap.
+
+{text}"""
+
+
+def group_by_tokens(texts: list[str], max_tokens: int) -> list[list[str]]:
+    """Pack consecutive texts into groups of at most `max_tokens` (an oversized text gets its own group)."""
+    groups, current, used = [], [], 0
+    for text in texts:
+        cost = count_tokens(text)
+        if current and used + cost > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
 
 class MemoryCompressor:
+    """
+    Map-reduce summarisation of old reflections.
+
+    Reflections are split into token-bounded groups that are summarised
+    concurrently (map); the summaries are then merged level by level
+    (reduce) until one remains. Every finished LLM call is checkpointed,
+    so an interrupted run picks up where it stopped.
+    """
+
     def __init__(self,
                  reflections_dir="./data/reflections",
-                 compressed_dir="./data/compressed"):
+                 compressed_dir="./data/compressed",
+                 max_workers: int = 3,
+                 group_tokens: int = COMPRESS_GROUP_TOKENS):
         self.reflections_dir = reflections_dir
         os.makedirs(compressed_dir, exist_ok=True)
         self.compressed_dir = compressed_dir
-        self.agent = ASBAgent()
+        self.max_workers = max_workers
+        self.group_tokens = group_tokens
+        # Summaries don't need retrieval: prompts go straight to the LLM
+        self.llm = services.get_llm()
+        self.checkpoint_path = os.path.join(compressed_dir, ".compress_checkpoint.json")
+        self._lock = threading.Lock()
+
+    # --- checkpoint ----------------------------------------------------------
+    def _load_checkpoint(self, run_id: str) -> dict:
+        data = load_json(self.checkpoint_path)
+        if data.get("run") != run_id:
+            return {}
+        return data.get("done", {})
+
+    def _save_checkpoint(self, run_id: str, done: dict):
+        save_json(self.checkpoint_path, {"run": run_id, "done": done})
+
+    # --- map / reduce ----------------------------------------------------------
+    def _summarize_level(self, groups: list[list[str]], template: str, run_id: str, done: dict) -> list[str]:
+        """Summarise each group concurrently, reusing checkpointed results."""
+        prompts = [template.format(text="\n\n---\n\n".join(group)) for group in groups]
+        keys = [hashlib.sha256(p.encode("utf-8")).hexdigest() for p in prompts]
+
+        def run(i):
+            if keys[i] in done:
+                return done[keys[i]]
+            summary = self.llm.invoke(prompts[i])
+            with self._lock:
+                done[keys[i]] = summary
+                self._save_checkpoint(run_id, done)
+            return summary
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(run, range(len(prompts))))
+
+    def summarize(self, texts: list[str], run_id: str = "adhoc") -> str:
+        """Map-reduce `texts` into a single summary."""
+        done = self._load_checkpoint(run_id)
+        if done:
+            print(f"♻️ Resuming compression — {len(done)} summaries already checkpointed")
+
+        # Map: reflections too big for one call are split into chunks first
+        pieces = []
+        for i, text in enumerate(texts):
+            if count_tokens(text) <= self.group_tokens:
+                pieces.append(text)
+            else:
+                pieces.extend(c["text"] for c in iter_chunks(text, str(i), self.group_tokens, 0))
+        groups = group_by_tokens(pieces, self.group_tokens)
+        print(f"🗺️ Map: {len(pieces)} pieces → {len(groups)} groups")
+        summaries = self._summarize_level(groups, MAP_PROMPT, run_id, done)
+
+        # Reduce: merge summaries until one remains
+        level = 1
+        while len(summaries) > 1:
+            groups = group_by_tokens(summaries, self.group_tokens)
+            if len(groups) == len(summaries):
+                # Summaries are individually near the budget: merge them pairwise anyway
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+            print(f"🔁 Reduce level {level}: {len(summaries)} summaries → {len(groups)}")
+            summaries = self._summarize_level(groups, REDUCE_PROMPT, run_id, done)
+            level += 1
+        return summaries[0]
 
     def compress_old_reflections(self, days: int = 14):
         """Summarize and compress reflections older than N days."""
@@ -30,22 +139,23 @@ class MemoryCompressor:
             print(f"🧹 No reflections older than {days} days to compress.")
             return None
 
-        content = ""
+        files.sort()
+        contents = []
         for f in files:
             with open(f) as fh:
-                content += fh.read() + "\n"
+                contents.append(fh.read())
+        # Same inputs → same run, so a rerun after an interruption resumes it
+        run_id = hashlib.sha256("\0".join(files + contents).encode("utf-8")).hexdigest()
 
         print(f"🧩 Compressing {len(files)} old reflections → summary.")
-        summary = self.agent.ask(
-            f"Summarize the following {len(files)} reflections into key insights, themes, and lessons:\n{content}"
-        )
+        summary = self.summarize(contents, run_id)
 
         out_file = os.path.join(self.compressed_dir, f"compressed_{datetime.now():%Y-%m-%d}.md")
         with open(out_file, "w") as f:
             f.write(summary)
 
         print(f"✅ Compressed reflections written → {out_file}")
-        db = InsightDB()
+        db = services.get_insight_db()
         db.add_insight(
             topic="long_term_summary",
             question=f"Summary of reflections older than {days} days",
@@ -54,4 +164,6 @@ class MemoryCompressor:
         )
         for f in files:
             os.rename(f, f.replace("reflections/", "reflections/archived_"))
-        return out_file
\ No newline at end of file
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return out_file
@@ -0,0 +1,62 @@
+# asb/brain/prompt_dag.py
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class PromptStep:
+    """
+    One node of a prompt DAG.
+
+    `fn` receives a dict with the results of the steps named in `deps`
+    and returns this step's result (usually an LLM answer).
+    """
+
+    def __init__(self, name: str, fn, deps: tuple = ()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+
+def _required(steps: dict, targets) -> set:
+    """Names of the target steps plus everything they transitively depend on."""
+    needed, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        stack.extend(steps[name].deps)
+    return needed
+
+
+def run_dag(steps: list[PromptStep], targets=None, max_workers: int = 3) -> dict:
+    """
+    Run prompt steps concurrently, each as soon as its dependencies finish.
+
+    Only `targets` and their upstream steps are executed (dead steps are
+    pruned); by default every step is a target. At most `max_workers`
+    steps are in flight at once. Returns {step name: result}.
+    """
+    by_name = {s.name: s for s in steps}
+    for s in steps:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Step '{s.name}' depends on unknown step(s): {missing}")
+    pending = _required(by_name, targets or by_name)
+
+    results, running = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            ready = [n for n in pending if all(d in results for d in by_name[n].deps)]
+            for name in ready:
+                step = by_name[name]
+                inputs = {d: results[d] for d in step.deps}
+                running[pool.submit(step.fn, inputs)] = name
+                pending.discard(name)
+            if not running:
+                raise ValueError(f"Dependency cycle between steps: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+    return results
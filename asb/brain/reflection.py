@@ -2,23 +2,24 @@
 import datetime
 import os
 import random
-from asb.brain.agent import ASBAgent
-from asb.brain.insight_db import InsightDB
+from asb.brain import services
 from asb.brain.logger import setup_logger
-from asb.brain.self_evaluator import SelfEvaluator
+from asb.brain.prompt_dag import PromptStep, run_dag
 log = setup_logger()
 
 
 class ReflectionEngine:
     def __init__(self,
                  reflections_dir: str = "./data/reflections",
-                 questions_file: str = "./data/questions/open_questions.md"):
+                 questions_file: str = "./data/questions/open_questions.md",
+                 max_workers: int = 3):
         os.makedirs(reflections_dir, exist_ok=True)
         os.makedirs(os.path.dirname(questions_file), exist_ok=True)
         self.reflections_dir = reflections_dir
         self.questions_file = questions_file
-        self.agent = ASBAgent()
-        self.db = InsightDB()
+        self.max_workers = max_workers
+        self.agent = services.get_agent()
+        self.db = services.get_insight_db()
 
     # --- helper functions ----------------------------------------------------
     def _load_open_questions(self):
@@ -37,22 +38,56 @@ class ReflectionEngine:
         return random.choice(questions) if questions else None
 
     # --- main reflection -----------------------------------------------------
+    def _build_steps(self, chosen_q: str = None) -> list[PromptStep]:
+        """
+        Reflection as a prompt DAG:
+
+            summary ──► new_questions
+            answer  ──► tags
+            topic
+
+        Independent prompts run concurrently; each edge passes the upstream
+        answer into the downstream prompt.
+        """
+        ask = self.agent.ask
+        steps = [
+            PromptStep("summary", lambda _: ask(
+                "Summarize what I've learned recently and identify recurring themes."
+            )),
+            PromptStep("new_questions", lambda r: ask(
+                "Based on this reflection, list 3 new thoughtful questions to explore next.\n\n"
+                f"Reflection:\n{r['summary']}"
+            ), deps=("summary",)),
+        ]
+        if chosen_q:
+            steps += [
+                PromptStep("answer", lambda _: ask(
+                    f"Answer this question based on my knowledge: {chosen_q}"
+                )),
+                PromptStep("topic", lambda _: ask(
+                    f"Categorize this question into 1-2 topic keywords: {chosen_q}"
+                )),
+                PromptStep("tags", lambda r: ask(
+                    f"Suggest 3 short tags for this content: {chosen_q} {r['answer']}"
+                ), deps=("answer",)),
+            ]
+        return steps
+
     def reflect(self):
-        # 1️⃣ Try answering one old question first
-        evaluator = SelfEvaluator()
-        metrics = evaluator.summarize_scores()  # optional print
+        services.get_evaluator().summarize_scores()  # prints the running averages
 
-        summary = self.agent.ask(
-            "Summarize what I've learned recently and avoid repeating prior reflections with high redundancy scores."
-        )
+        # 1️⃣ Pick one old question to revisit alongside the new reflection
         open_qs = self._load_open_questions()
         chosen_q = self._select_question(open_qs)
-        old_answer = None
-
         if chosen_q:
             log.info(f"🤔 Revisiting previous question: {chosen_q}")
-            old_answer = self.agent.ask(f"Answer this question based on my knowledge: {chosen_q}")
 
+        # 2️⃣ Run summary, answer, topic, tags and new questions as one DAG
+        results = run_dag(self._build_steps(chosen_q), max_workers=self.max_workers)
+        summary = results["summary"]
+        old_answer = results.get("answer")
+
+        if chosen_q:
             # remove answered question from list
             remaining = [q for q in open_qs if q != chosen_q]
             with open(self.questions_file, "w") as f:
@@ -61,27 +96,10 @@ class ReflectionEngine:
 
         if chosen_q and old_answer:
             # Store in insight DB
-            topic_guess = self.agent.ask(
-                f"Categorize this question into 1-2 topic keywords: {chosen_q}"
-            )
-            tags_guess = self.agent.ask(
-                f"Suggest 3 short tags for this content: {chosen_q} {old_answer}"
-            )
-            self.db.add_insight(topic_guess, chosen_q, old_answer, tags_guess.split(","))
-
-        summary = self.agent.ask(
-            "Reflect on what I have done across all sources (git commits, notes, reflections). Identify recurring themes and possible next improvements."
-        )
-
-        # 2️⃣ Generate a new reflection summary
-        summary = self.agent.ask(
-            "Summarize what I've learned recently and identify recurring themes."
-        )
-
-        # 3️⃣ Generate new follow-up questions
-        new_qs_text = self.agent.ask(
-            "Based on this reflection, list 3 new thoughtful questions to explore next."
-        )
+            self.db.add_insight(results["topic"], chosen_q, old_answer, results["tags"].split(","))
+
+        # 3️⃣ Save the new follow-up questions
+        new_qs_text = results["new_questions"]
         # extract bullet points (simple heuristic)
         new_qs = [line.strip("- ").strip()
                   for line in new_qs_text.splitlines() if line.strip()]
@@ -1,75 +1,93 @@
 # asb/brain/research_agent.py
 import os
-import requests
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from asb.brain.agent import ASBAgent
-from asb.brain.memory import Memory
-from asb.brain.reflection import ReflectionEngine
-from asb.brain.insight_db import InsightDB
-from langchain_ollama import OllamaLLM
-import subprocess
+from asb.brain import services
+from asb.brain.web_search import WebSearch, normalize_query
 load_dotenv()
 
-def is_ollama_available():
-    try:
-        subprocess.run(["ollama", "list"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=2)
-        return True
-    except Exception:
-        return False
-
 
 class ResearchAgent:
-    def __init__(self, model_name: str = None):
-        if not is_ollama_available():
+    """
+    Researches open questions: web search (when configured) → LLM summary → storage.
+
+    Questions run concurrently on `max_workers` threads; at most
+    `llm_concurrency` summaries are generated at once so searches keep
+    flowing while the LLM is busy.
+    """
+
+    def __init__(self, model_name: str = None, llm=None, searcher: WebSearch = None,
+                 max_workers: int = 8, llm_concurrency: int = 2):
+        if llm is None and not services.is_ollama_running():
             raise RuntimeError("⚠️ Ollama not running. Start with `ollama serve` before using ResearchAgent.")
-        self.model_name = model_name or os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-        self.llm = OllamaLLM(model=self.model_name)
-        self.agent = ASBAgent()
-        self.db = InsightDB()
-        self.memory = Memory()
-        self.reflection_engine = ReflectionEngine()
+        self.model_name = model_name or services.OLLAMA_MODEL
+        self.llm = llm or services.get_llm(self.model_name)
+        self.searcher = searcher or WebSearch()
+        self.max_workers = max_workers
+        self._llm_slots = threading.BoundedSemaphore(llm_concurrency)
 
-        
+    def _invoke(self, prompt: str) -> str:
+        with self._llm_slots:
+            return self.llm.invoke(prompt)
 
     def _summarize_with_llm(self, text: str) -> str:
         """Summarize content using Ollama LLM."""
         prompt = f"Summarize the following information into concise factual insights:\n{text}"
-        return self.llm.invoke(prompt)
+        return self._invoke(prompt)
 
-    def research_question(self, question: str):
-        """Search, summarize, and store new findings using Ollama."""
+    def find_answer(self, question: str) -> str:
+        """Search and summarize one question (nothing is stored)."""
         print(f"🔎 Researching: {question}")
 
         # Try web search first
-        serper_key = os.getenv("SERPER_API_KEY")
-        if serper_key:
+        if self.searcher.enabled:
             try:
-                url = f"https://serpapi.com/search.json?q={question.replace(' ', '+')}&api_key={serper_key}"
-                response = requests.get(url, timeout=10)
-                data = response.json()
-                snippets = " ".join([r.get("snippet", "") for r in data.get("organic_results", [])[:5]])
+                snippets = " ".join(self.searcher.search(question))
                 if snippets.strip():
-                    results = self._summarize_with_llm(snippets)
-                else:
-                    results = self._summarize_with_llm(f"No results found for {question}")
+                    return self._summarize_with_llm(snippets)
+                return self._summarize_with_llm(f"No results found for {question}")
             except Exception as e:
                 print(f"⚠️ Web search failed ({e}). Falling back to internal reasoning.")
-                results = self.llm.invoke(f"Generate a short factual summary about: {question}")
-        else:
-            # No web access → reasoning-only research
-            results = self.llm.invoke(f"Explain the key concepts behind: {question}")
+                return self._invoke(f"Generate a short factual summary about: {question}")
+        # No web access → reasoning-only research
+        return self._invoke(f"Explain the key concepts behind: {question}")
 
-        # Store to Insight DB
-        self.db.add_insight(topic="research", question=question, answer=results, tags=["research", "auto"])
+    def find_answers(self, questions: list[str]) -> list[tuple[str, str]]:
+        """Research questions concurrently; returns [(question, answer)] in input order."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            answers = list(pool.map(self.find_answer, questions))
+        return list(zip(questions, answers))
 
-        # Add to semantic memory
-        self.memory.collection.add(
-            documents=[results],
-            metadatas=[{"source": "auto_research", "question": question}],
-            ids=[f"research_{hash(question)}"]
+    def store(self, results: list[tuple[str, str]]):
+        """Save (question, answer) pairs to the Insight DB and semantic memory in one batch each."""
+        if not results:
+            return
+        services.get_insight_db().add_insights(
+            ("research", question, answer, ["research", "auto"]) for question, answer in results
+        )
+        memory = services.get_memory()
+        written = memory.upsert_documents(
+            (
+                "research_" + hashlib.sha1(normalize_query(question).encode("utf-8")).hexdigest()[:16],
+                answer,
+                {"source": "auto_research", "question": question},
+            )
+            for question, answer in results
         )
+        # A re-researched question may now have fewer chunks: drop the old tail
+        kept = {i for ids in written.values() for i in ids}
+        existing = memory.collection.get(where={"parent_id": {"$in": list(written)}}, include=[])["ids"]
+        stale = [i for i in existing if i not in kept]
+        if stale:
+            memory._delete_batched(stale)
+        print(f"🧠 {len(results)} new insights added to long-term memory.")
 
-        print("🧠 New insight added to long-term memory.")
+    def research_question(self, question: str):
+        """Search, summarize, and store new findings using Ollama."""
+        results = self.find_answer(question)
+        self.store([(question, results)])
         return results
 
     def run_autonomous_research(self, max_questions: int = 3):
@@ -82,12 +100,11 @@ class ResearchAgent:
         with open(open_q_file) as f:
             questions = [q.strip("- ").strip() for q in f if q.strip()]
 
-        researched = []
-        for q in questions[:max_questions]:
-            ans = self.research_question(q)
-            researched.append((q, ans[:200] + "..."))
+        results = self.find_answers(questions[:max_questions])
+        self.store(results)
+        researched = [(q, ans[:200] + "...") for q, ans in results]
 
         print(f"✅ Research cycle complete — {len(researched)} questions processed.")
         print("🪞 Initiating post-research reflection...")
-        self.reflection_engine.reflect()
-        print("✨ Reflection after research completed.")
\ No newline at end of file
+        services.get_reflection_engine().reflect()
+        print("✨ Reflection after research completed.")
@@ -1,66 +1,188 @@
 # asb/brain/scheduler.py
-from apscheduler.schedulers.background import BackgroundScheduler
-from asb.brain.reflection import ReflectionEngine
+"""
+Long-running scheduler behind `asb daemon`.
+
+One BackgroundScheduler per process, with its jobs in SQLite (APScheduler's
+SQLAlchemy job store), so schedules and next run times survive restarts.
+Each job gets its own table: a daemon started for a subset of jobs
+(e.g. `asb schedule`) neither runs nor forgets the others. Jobs are stored
+as textual "module:function" references to the run_* functions below,
+which take their LLM, memory and agents from the services registry. Those
+are warmed once at start-up and reused by every tick.
+
+Missed runs are coalesced into one, may start up to MISFIRE_GRACE seconds
+late, and a job never overlaps itself. By default jobs run one at a time
+(they share one Ollama anyway). A lock file keeps a second daemon off the
+same store.
+"""
+import os
 import time
+import fcntl
+import signal
+import threading
+from dotenv import load_dotenv
+from asb.brain import services
 from asb.brain.logger import setup_logger
-from asb.brain.memory_compressor import MemoryCompressor
-from asb.brain.research_agent import ResearchAgent
-from asb.brain.automation_graph import workflow
+
+load_dotenv()
 log = setup_logger()
 
+SCHEDULER_DB_PATH = os.getenv("SCHEDULER_DB_PATH", "./data/scheduler.db")
+MISFIRE_GRACE = int(os.getenv("SCHEDULER_MISFIRE_GRACE", "3600"))
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "1"))
+
+# name -> (job reference, interval trigger arguments)
+JOBS = {
+    "reflection": ("asb.brain.scheduler:run_reflection", {"hours": 24}),
+    "compression": ("asb.brain.scheduler:run_compression", {"days": 7}),
+    "research": ("asb.brain.scheduler:run_research", {"days": 7}),
+    "automation": ("asb.brain.scheduler:run_automation", {"days": 1}),
+}
+
+
+# --- jobs ------------------------------------------------------------------------
+def run_reflection():
+    services.get_reflection_engine().reflect()
+
+
+def run_compression(days: int = 14):
+    services.get_compressor().compress_old_reflections(days)
+
+
+def run_research(max_questions: int = 3):
+    services.get_research_agent().run_autonomous_research(max_questions)
+
+
+def run_automation():
+    from asb.brain.automation_graph import workflow
+    workflow.invoke({})
+
+
+def warm_services():
+    """Build the shared LLM, embedder, memory and databases before the first tick."""
+    start = time.perf_counter()
+    try:
+        services.get_llm()
+        services.get_memory()
+        services.get_cognition()
+        services.get_insight_db()
+    except Exception as e:
+        # Jobs build whatever is missing lazily on their first run
+        log.warning(f"⚠️ Could not warm services: {e}")
+        return
+    log.info(f"🔥 Services warm in {time.perf_counter() - start:.2f}s")
+
+
+# --- scheduler -------------------------------------------------------------------
+def _acquire_lock():
+    os.makedirs(os.path.dirname(SCHEDULER_DB_PATH) or ".", exist_ok=True)
+    lock_file = open(SCHEDULER_DB_PATH + ".lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        raise RuntimeError(f"Another asb daemon is already using {SCHEDULER_DB_PATH}.")
+    return lock_file
+
 
-def start_daily_reflection(timeout_hours: int = 1):
+def create_scheduler(names):
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.executors.pool import ThreadPoolExecutor
+    from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f"sqlite:///{SCHEDULER_DB_PATH}")
+    scheduler = BackgroundScheduler(
+        jobstores={name: SQLAlchemyJobStore(engine=engine, tablename=f"jobs_{name}") for name in names},
+        executors={"default": ThreadPoolExecutor(SCHEDULER_WORKERS)},
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": MISFIRE_GRACE},
+    )
+    _log_events(scheduler)
+    return scheduler
+
+
+def _log_events(scheduler):
+    from apscheduler.events import (EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR,
+                                    EVENT_JOB_MISSED, EVENT_JOB_MAX_INSTANCES)
+    started = {}
+
+    def listener(event):
+        if event.code == EVENT_JOB_SUBMITTED:
+            started[event.job_id] = time.perf_counter()
+            log.info(f"▶️ Job {event.job_id} started")
+            return
+        if event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+            elapsed = time.perf_counter() - started.pop(event.job_id, time.perf_counter())
+            if event.code == EVENT_JOB_EXECUTED:
+                log.info(f"✅ Job {event.job_id} finished in {elapsed:.1f}s")
+            else:
+                log.error(f"❌ Job {event.job_id} failed after {elapsed:.1f}s: {event.exception}")
+        elif event.code == EVENT_JOB_MISSED:
+            log.warning(f"⏭️ Job {event.job_id} missed its {event.scheduled_run_time} run (past the grace time)")
+        elif event.code == EVENT_JOB_MAX_INSTANCES:
+            log.warning(f"⏳ Job {event.job_id} is still running — skipped an overlapping run")
+
+    scheduler.add_listener(listener, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR
+                           | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+
+
+def ensure_job(scheduler, name: str, reset: bool = False):
+    """Add the job unless its store already has it (keeping its next run time across restarts)."""
+    ref, interval = JOBS[name]
+    if reset or scheduler.get_job(name, jobstore=name) is None:
+        scheduler.add_job(ref, "interval", id=name, name=name, jobstore=name, replace_existing=True, **interval)
+
+
+def run_daemon(jobs=None, timeout_hours: float = None, reset: bool = False):
     """
-    Start a background reflection job that runs daily,
-    but automatically stops after `timeout_hours`.
+    Run the selected jobs (default: all) until interrupted, SIGTERM, or
+    `timeout_hours`. `reset` re-creates their schedules from JOBS.
     """
-    engine = ReflectionEngine()
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(engine.reflect, 'interval', hours=24)
-    scheduler.start()
-
-    log.info(f"🕰️ Daily reflection job started. Will run for {timeout_hours} hour(s).")
-    start_time = time.time()
-    timeout = timeout_hours * 3600
+    names = list(dict.fromkeys(jobs or JOBS))
+    unknown = [n for n in names if n not in JOBS]
+    if unknown:
+        raise ValueError(f"Unknown jobs {unknown}; choose from {list(JOBS)}")
 
+    lock_file = _acquire_lock()
+    stop = threading.Event()
     try:
-        while True:
-            time.sleep(30)
-            if time.time() - start_time >= timeout:
-                log.info("⏱️ Timeout reached — stopping scheduler.")
-                scheduler.shutdown()
-                break
-    except KeyboardInterrupt:
-        log.info("🧩 Manual interrupt — shutting down.")
+        warm_services()
+        scheduler = create_scheduler(names)
+        # Start paused so stored jobs can be looked up before anything fires
+        scheduler.start(paused=True)
+        for name in names:
+            ensure_job(scheduler, name, reset)
+        scheduler.resume()
+        for job in scheduler.get_jobs():
+            log.info(f"🕰️ {job.id}: next run {job.next_run_time:%Y-%m-%d %H:%M}")
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        log.info(f"🧠 ASB daemon running {', '.join(names)}"
+                 + (f" for {timeout_hours} hour(s)." if timeout_hours else "."))
+        try:
+            stop.wait(timeout_hours * 3600 if timeout_hours else None)
+            log.info("⏱️ Stopping scheduler.")
+        except KeyboardInterrupt:
+            log.info("🧩 Manual interrupt — shutting down.")
+        # Waits for a job that is mid-run; its next run time is already stored
         scheduler.shutdown()
+    finally:
+        lock_file.close()
+
+
+# --- single-job entry points (kept for the schedule-* commands) ---------------------
+def start_daily_reflection(timeout_hours: float = 1):
+    run_daemon(["reflection"], timeout_hours)
+
 
 def start_weekly_compression():
-    compressor = MemoryCompressor()
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(compressor.compress_old_reflections, "interval", days=7)
-    scheduler.start()
+    run_daemon(["compression"])
 
-def start_weekly_research():
-    ra = ResearchAgent()
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(ra.run_autonomous_research, 'interval', days=7)
-    scheduler.start()
-    print("🤖 Weekly autonomous research enabled.")
-    try:
-        while True:
-            time.sleep(60)
-    except KeyboardInterrupt:
-        scheduler.shutdown()
 
+def start_weekly_research():
+    run_daemon(["research"])
 
 
 def start_autonomous_loop():
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(lambda: workflow.invoke({}), 'interval', days=1)
-    scheduler.start()
-    print("🧠 ASB automation loop scheduled every 24 hours.")
-    try:
-        while True:
-            time.sleep(60)
-    except KeyboardInterrupt:
-        scheduler.shutdown()
\ No newline at end of file
+    run_daemon(["automation"])
@@ -0,0 +1,253 @@
+# asb/brain/score_store.py
+import os
+import re
+import csv
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from asb.brain.utils import open_sqlite
+
+SCORES_DB_PATH = "./data/metrics/scores.db"
+LEGACY_SCORES_CSV = "./data/metrics/self_scores.csv"
+METRICS = ("clarity", "novelty", "actionability", "redundancy")
+
+# "7, 8, 6.5, 3, topics..., suggestions..." — optionally bulleted / quoted
+_SCORE_LINE_RE = re.compile(
+    r"^[\s\"'`*-]*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)\s*(?:,(.*))?$"
+)
+_LEGACY_RECORD_RE = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),([^,]*),(.*)$")
+# "Clarity: 7" / "**Novelty** - 8/10"
+_LABELLED_RE = {m: re.compile(rf"{m}\W{{0,6}}(\d+(?:\.\d+)?)", re.IGNORECASE) for m in METRICS}
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_eval_text(text: str):
+    """
+    Parse an LLM evaluation into {clarity, novelty, actionability, redundancy, topics, suggestions}.
+
+    Returns None when no scores can be found.
+    """
+    for line in text.splitlines():
+        m = _SCORE_LINE_RE.match(line.strip())
+        if m:
+            rest = next(csv.reader([m.group(5) or ""]), [])
+            return {
+                **{metric: float(m.group(i + 1)) for i, metric in enumerate(METRICS)},
+                "topics": rest[0].strip() if rest else "",
+                "suggestions": ",".join(rest[1:]).strip(),
+            }
+    labelled = {metric: rx.search(text) for metric, rx in _LABELLED_RE.items()}
+    if all(labelled.values()):
+        return {
+            **{metric: float(m.group(1)) for metric, m in labelled.items()},
+            "topics": "",
+            "suggestions": "",
+        }
+    return None
+
+
+class ScoreStore:
+    """
+    SQLite store for reflection evaluations.
+
+    `scores` keeps one typed row per evaluation (indexed by timestamp and
+    file); `score_daily` and `score_totals` are running sums kept current by
+    triggers, so averages over the last N days read at most N rows.
+    `score_cache` maps (reflection content hash, model) to the last evaluation,
+    and `scores` holds at most one row per (content hash, model), so racing
+    evaluators cannot double-count a reflection.
+    """
+
+    def __init__(self, db_path: str = SCORES_DB_PATH, legacy_csv: str = LEGACY_SCORES_CSV):
+        self.conn = open_sqlite(db_path)
+        self.lock = threading.Lock()
+        self._create_tables()
+        if legacy_csv:
+            self._import_legacy_csv(legacy_csv)
+
+    def _create_tables(self):
+        sums = ", ".join(f"sum_{m} REAL NOT NULL DEFAULT 0" for m in METRICS)
+        adds = ", ".join(f"sum_{m} = sum_{m} + NEW.{m}" for m in METRICS)
+        new_vals = ", ".join(f"NEW.{m}" for m in METRICS)
+        self.conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS score_cache (
+            content_hash TEXT NOT NULL,
+            model TEXT NOT NULL,
+            reflection_file TEXT,
+            eval_text TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (content_hash, model)
+        );
+
+        CREATE TABLE IF NOT EXISTS scores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            day TEXT NOT NULL,
+            reflection_file TEXT,
+            model TEXT,
+            clarity REAL,
+            novelty REAL,
+            actionability REAL,
+            redundancy REAL,
+            topics TEXT,
+            suggestions TEXT,
+            raw TEXT,
+            content_hash TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_scores_timestamp ON scores(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_scores_file ON scores(reflection_file);
+
+        CREATE TABLE IF NOT EXISTS score_daily (day TEXT PRIMARY KEY, n INTEGER NOT NULL DEFAULT 0, {sums});
+        CREATE TABLE IF NOT EXISTS score_totals (id INTEGER PRIMARY KEY CHECK (id = 1), n INTEGER NOT NULL DEFAULT 0, {sums});
+        INSERT OR IGNORE INTO score_totals (id) VALUES (1);
+
+        CREATE TRIGGER IF NOT EXISTS trg_scores_rollup AFTER INSERT ON scores
+        WHEN NEW.clarity IS NOT NULL AND NEW.novelty IS NOT NULL
+             AND NEW.actionability IS NOT NULL AND NEW.redundancy IS NOT NULL
+        BEGIN
+            INSERT INTO score_daily (day, n, {", ".join(f"sum_{m}" for m in METRICS)})
+            VALUES (NEW.day, 1, {new_vals})
+            ON CONFLICT(day) DO UPDATE SET n = n + 1, {adds};
+            UPDATE score_totals SET n = n + 1, {adds} WHERE id = 1;
+        END;
+
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(scores)")}
+        if "content_hash" not in columns:
+            self.conn.execute("ALTER TABLE scores ADD COLUMN content_hash TEXT")
+        # Legacy rows have no hash (NULLs never collide)
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_scores_content ON scores(content_hash, model)")
+        self.conn.commit()
+
+    def _import_legacy_csv(self, path: str):
+        """One-time import of the old self_scores.csv log."""
+        if not os.path.exists(path):
+            return
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'csv_imported'").fetchone():
+                return
+            # Records were "timestamp,file,<raw LLM text>" and the raw text may span lines
+            records = []
+            with open(path) as f:
+                for line in f:
+                    m = _LEGACY_RECORD_RE.match(line.rstrip("\n"))
+                    if m:
+                        records.append([m.group(1), m.group(2), m.group(3)])
+                    elif records:
+                        records[-1][2] += "\n" + line.rstrip("\n")
+            rows = [self._row(ts, name, None, text) for ts, name, text in records]
+            self.conn.executemany(self._INSERT_SQL, rows)
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('csv_imported', ?)", (path,))
+            self.conn.commit()
+        if rows:
+            print(f"📥 Imported {len(rows)} legacy scores from {path}")
+
+    # --- evaluation cache ----------------------------------------------------
+    def get_cached(self, content_hash: str, model: str):
+        """Return the stored evaluation text, or None if this content was never scored by `model`."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT eval_text FROM score_cache WHERE content_hash = ? AND model = ?",
+                (content_hash, model),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_cached(self, content_hash: str, model: str, reflection_file: str, eval_text: str):
+        with self.lock:
+            self.conn.execute("""
+            INSERT OR REPLACE INTO score_cache (content_hash, model, reflection_file, eval_text, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """, (content_hash, model, reflection_file, eval_text, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            self.conn.commit()
+
+    # --- structured scores ---------------------------------------------------
+    # OR IGNORE: a second evaluation of the same content by the same model is dropped
+    # (and, being ignored, never reaches the rollup trigger)
+    _INSERT_SQL = """
+    INSERT OR IGNORE INTO scores (timestamp, day, reflection_file, model, clarity, novelty,
+                                  actionability, redundancy, topics, suggestions, raw, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    @staticmethod
+    def _row(timestamp: str, reflection_file: str, model: str, eval_text: str, content_hash: str = None):
+        parsed = parse_eval_text(eval_text) or {}
+        return (
+            timestamp, timestamp[:10], reflection_file, model,
+            *(parsed.get(m) for m in METRICS),
+            parsed.get("topics"), parsed.get("suggestions"), eval_text, content_hash,
+        )
+
+    def add_score(self, reflection_file: str, model: str, eval_text: str, timestamp: str = None,
+                  content_hash: str = None) -> dict:
+        """Parse and store one evaluation. Returns the parsed scores (None where unparseable)."""
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        row = self._row(timestamp, reflection_file, model, eval_text, content_hash)
+        with self.lock:
+            self.conn.execute(self._INSERT_SQL, row)
+            self.conn.commit()
+        return dict(zip(METRICS, row[4:8]))
+
+    def averages(self, days: int = None) -> dict:
+        """
+        Mean of each metric over all history, or over the last `days` days.
+
+        Reads the single totals row, or one rollup row per day in the window.
+        Returns {"n": 0} when there is no data.
+        """
+        cols = ", ".join(f"SUM(sum_{m})" for m in METRICS)
+        with self.lock:
+            if days is None:
+                row = self.conn.execute(
+                    f"SELECT n, {', '.join(f'sum_{m}' for m in METRICS)} FROM score_totals WHERE id = 1"
+                ).fetchone()
+            else:
+                cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+                row = self.conn.execute(
+                    f"SELECT SUM(n), {cols} FROM score_daily WHERE day >= ?", (cutoff,)
+                ).fetchone()
+        n = (row[0] or 0) if row else 0
+        if not n:
+            return {"n": 0}
+        return {"n": n, **{m: total / n for m, total in zip(METRICS, row[1:])}}
+
+    def daily(self, days: int = None) -> list[tuple]:
+        """[(day, n, mean clarity, mean novelty, mean actionability, mean redundancy)] oldest first."""
+        means = ", ".join(f"sum_{m} / n" for m in METRICS)
+        sql = f"SELECT day, n, {means} FROM score_daily"
+        params = ()
+        if days is not None:
+            sql += " WHERE day >= ?"
+            params = ((datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d"),)
+        with self.lock:
+            return self.conn.execute(sql + " ORDER BY day", params).fetchall()
+
+    def version(self) -> int:
+        """Last score id: scores are append-only, so it changes exactly when one is added."""
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM scores").fetchone()[0]
+
+    def recent(self, limit: int = 50) -> list[tuple]:
+        """[(timestamp, reflection_file, clarity, novelty, actionability, redundancy, topics, suggestions)] oldest first."""
+        with self.lock:
+            rows = self.conn.execute(f"""
+            SELECT timestamp, reflection_file, {", ".join(METRICS)}, topics, suggestions
+            FROM scores ORDER BY timestamp DESC LIMIT ?
+            """, (limit,)).fetchall()
+        return rows[::-1]
+
+    def since(self, days: int) -> list[tuple]:
+        """Same columns as recent(), for evaluations in the last `days` days."""
+        cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        with self.lock:
+            return self.conn.execute(f"""
+            SELECT timestamp, reflection_file, {", ".join(METRICS)}, topics, suggestions
+            FROM scores WHERE timestamp >= ? ORDER BY timestamp
+            """, (cutoff,)).fetchall()
+
+    def close(self):
+        self.conn.close()
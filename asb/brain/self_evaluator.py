@@ -1,74 +1,97 @@
 # asb/brain/self_evaluator.py
 import os
 import glob
-import statistics
-from datetime import datetime
-from asb.brain.agent import ASBAgent
-from asb.brain.insight_db import InsightDB
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asb.brain import services
+from asb.brain.score_store import ScoreStore, SCORES_DB_PATH, content_hash
 
 class SelfEvaluator:
     def __init__(self,
                  reflections_dir="./data/reflections",
-                 scores_file="./data/metrics/self_scores.csv"):
+                 scores_file="./data/metrics/self_scores.csv",
+                 max_workers: int = 3):
         os.makedirs(os.path.dirname(scores_file), exist_ok=True)
         self.reflections_dir = reflections_dir
         self.scores_file = scores_file
-        self.agent = ASBAgent()
-        self.db = InsightDB()
+        self.max_workers = max_workers
+        self.agent = services.get_agent()
+        self.db = services.get_insight_db()
+        self.store = ScoreStore(legacy_csv=scores_file)
+        self.model = getattr(self.agent.cognition.llm, "model", None) or services.OLLAMA_MODEL
+        # One evaluation pass at a time, so concurrent callers hit the cache instead of the LLM
+        self._lock = threading.Lock()
+
+    def _score(self, text: str) -> str:
+        return self.agent.ask(
+            f"""Evaluate this reflection on:
+            1. Clarity (1–10)
+            2. Novelty (1–10)
+            3. Actionability (1–10)
+            4. Redundancy (1–10, lower is better)
+            5. Main topics and improvement suggestions.
+
+            Respond in CSV format: clarity,novelty,actionability,redundancy,topics,suggestions
+
+            Reflection:
+            {text}"""
+        )
 
     def evaluate_recent_reflections(self, days: int = 7):
+        """
+        Score the latest reflections, serving unchanged ones from the score cache.
+
+        Only reflections whose content (or the model) changed since their last
+        evaluation reach the LLM, and those are scored concurrently. Calls on
+        the same evaluator are serialised.
+        """
+        with self._lock:
+            return self._evaluate(days)
+
+    def _evaluate(self, days: int):
         files = sorted(glob.glob(os.path.join(self.reflections_dir, "reflection_*.md")))
         if not files:
             print("⚠️ No reflections found.")
             return None
 
         latest = files[-days:]
-        results = []
+        scored = {}
+        to_score = []
         for f in latest:
             with open(f) as fh:
                 text = fh.read()
-            print(f"🧮 Evaluating {os.path.basename(f)} ...")
-            eval_text = self.agent.ask(
-                f"""Evaluate this reflection on:
-                1. Clarity (1–10)
-                2. Novelty (1–10)
-                3. Actionability (1–10)
-                4. Redundancy (1–10, lower is better)
-                5. Main topics and improvement suggestions.
+            digest = content_hash(text)
+            cached = self.store.get_cached(digest, self.model)
+            if cached is not None:
+                print(f"♻️ {os.path.basename(f)} unchanged — using cached score")
+                scored[f] = cached
+            else:
+                print(f"🧮 Evaluating {os.path.basename(f)} ...")
+                to_score.append((f, digest, text))
 
-                Respond in CSV format: clarity,novelty,actionability,redundancy,topics,suggestions
+        if to_score:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                fresh = list(pool.map(lambda item: self._score(item[2]), to_score))
+            for (f, digest, _), eval_text in zip(to_score, fresh):
+                self.store.put_cached(digest, self.model, os.path.basename(f), eval_text)
+                self.store.add_score(os.path.basename(f), self.model, eval_text, content_hash=digest)
+                scored[f] = eval_text
 
-                Reflection:
-                {text}"""
-            )
-
-            results.append((os.path.basename(f), eval_text))
-            with open(self.scores_file, "a") as log:
-                log.write(f"{datetime.now():%Y-%m-%d %H:%M:%S},{os.path.basename(f)},{eval_text}\n")
-
-        print(f"✅ Evaluated {len(results)} reflections. Results saved → {self.scores_file}")
+        results = [(os.path.basename(f), scored[f]) for f in latest]
+        print(f"✅ Evaluated {len(results)} reflections ({len(to_score)} scored, "
+              f"{len(results) - len(to_score)} cached). Results saved → {SCORES_DB_PATH}")
         return results
 
-    def summarize_scores(self):
-        if not os.path.exists(self.scores_file):
+    def summarize_scores(self, days: int = None):
+        """Print and return average scores (all history, or the last `days` days)."""
+        averages = self.store.averages(days)
+        if not averages["n"]:
             print("No self-evaluation data yet.")
-            return
-        clarity, novelty, actionability, redundancy = [], [], [], []
-        with open(self.scores_file) as f:
-            for line in f:
-                parts = line.strip().split(",")
-                if len(parts) >= 8:
-                    try:
-                        clarity.append(float(parts[2]))
-                        novelty.append(float(parts[3]))
-                        actionability.append(float(parts[4]))
-                        redundancy.append(float(parts[5]))
-                    except ValueError:
-                        continue
-
-        if clarity:
-            print("📊 Average Scores:")
-            print(f"  Clarity: {statistics.mean(clarity):.2f}")
-            print(f"  Novelty: {statistics.mean(novelty):.2f}")
-            print(f"  Actionability: {statistics.mean(actionability):.2f}")
-            print(f"  Redundancy: {statistics.mean(redundancy):.2f}")
\ No newline at end of file
+            return None
+        window = f" (last {days} days)" if days else ""
+        print(f"📊 Average Scores{window}:")
+        print(f"  Clarity: {averages['clarity']:.2f}")
+        print(f"  Novelty: {averages['novelty']:.2f}")
+        print(f"  Actionability: {averages['actionability']:.2f}")
+        print(f"  Redundancy: {averages['redundancy']:.2f}")
+        return averages
@@ -0,0 +1,113 @@
+# asb/brain/services.py
+"""
+Process-wide registry of shared ASB services.
+
+Every component (agents, reflection, research, evaluation, ingestion) asks
+this module for its LLM, embedder, vector memory and InsightDB instead of
+building its own, so a single CLI run or scheduler tick pays the setup cost
+once. Everything is built lazily on first use.
+"""
+import os
+import time
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+HEALTH_TTL = float(os.getenv("OLLAMA_HEALTH_TTL", "30"))
+
+_lock = threading.RLock()
+_instances = {}
+_health = {"checked_at": None, "ok": False}
+
+
+def _ollama_url(path: str) -> str:
+    host = OLLAMA_HOST if "://" in OLLAMA_HOST else f"http://{OLLAMA_HOST}"
+    return host.rstrip("/") + path
+
+
+def is_ollama_running(timeout: float = 1.0) -> bool:
+    """Check if the Ollama server answers over HTTP (result cached for HEALTH_TTL seconds)."""
+    import urllib.request
+    now = time.monotonic()
+    with _lock:
+        if _health["checked_at"] is not None and now - _health["checked_at"] < HEALTH_TTL:
+            return _health["ok"]
+    try:
+        with urllib.request.urlopen(_ollama_url("/api/version"), timeout=timeout) as resp:
+            ok = resp.status == 200
+    except (OSError, ValueError):
+        ok = False
+    with _lock:
+        _health.update(checked_at=now, ok=ok)
+    return ok
+
+
+def _get(key, factory):
+    with _lock:
+        if key not in _instances:
+            _instances[key] = factory()
+        return _instances[key]
+
+
+def get_llm(model: str = None):
+    from langchain_ollama import OllamaLLM
+    model = model or OLLAMA_MODEL
+    return _get(("llm", model), lambda: OllamaLLM(model=model))
+
+
+def get_embedder():
+    from asb.brain.embeddings import get_embedding_model
+    return _get("embedder", get_embedding_model)
+
+
+def get_memory():
+    from asb.brain.memory import Memory
+    return _get("memory", Memory)
+
+
+def get_cognition():
+    from asb.brain.cognition import Cognition
+    return _get("cognition", Cognition)
+
+
+def get_agent():
+    from asb.brain.agent import ASBAgent
+    return _get("agent", ASBAgent)
+
+
+def get_insight_db():
+    from asb.brain.insight_db import InsightDB
+    return _get("insight_db", InsightDB)
+
+
+def get_reflection_engine():
+    from asb.brain.reflection import ReflectionEngine
+    return _get("reflection", ReflectionEngine)
+
+
+def get_compressor():
+    from asb.brain.memory_compressor import MemoryCompressor
+    return _get("compressor", MemoryCompressor)
+
+
+def get_research_agent():
+    from asb.brain.research_agent import ResearchAgent
+    return _get("research_agent", ResearchAgent)
+
+
+def get_evaluator():
+    from asb.brain.self_evaluator import SelfEvaluator
+    return _get("evaluator", SelfEvaluator)
+
+
+def reset():
+    """Drop all cached services (and the health probe result)."""
+    with _lock:
+        db = _instances.get("insight_db")
+        if db is not None:
+            db.close()
+        _instances.clear()
+        _health.update(checked_at=None, ok=False)
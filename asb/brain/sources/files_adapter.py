@@ -5,13 +5,33 @@ class FilesAdapter:
     def __init__(self, path="./data/external_notes"):
         self.path = path
 
+    def path_for(self, file: str) -> str:
+        """
+        The path fetch_entries() reports for a file in this folder (part of its
+        stable id). Always absolute, so "./data/external_notes" and its absolute
+        form give a file the same id.
+        """
+        return os.path.join(os.path.abspath(self.path), os.path.basename(file))
+
+    def entry_for(self, file: str):
+        """Entry for a single file, or None if it is gone or not a note."""
+        if not file.endswith(".md"):
+            return None
+        try:
+            with open(file) as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        return {
+            "source": "local_file",
+            "content": content,
+            "path": self.path_for(file)
+        }
+
     def fetch_entries(self):
         entries = []
         for file in glob.glob(os.path.join(self.path, "*.md")):
-            with open(file) as f:
-                entries.append({
-                    "source": "local_file",
-                    "content": f.read(),
-                    "path": file
-                })
-        return entries
\ No newline at end of file
+            entry = self.entry_for(file)
+            if entry:
+                entries.append(entry)
+        return entries
@@ -1,28 +1,145 @@
-import subprocess
 import os
+import subprocess
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from asb.brain.utils import load_json, update_json
+
+load_dotenv()
+
+GIT_CURSOR_PATH = os.getenv("GIT_CURSOR_PATH", "./data/cursors/git.json")
+# Comma-separated repositories ingested by `ingest-all`
+GIT_REPOS = [p.strip() for p in os.getenv("GIT_REPOS", ".").split(",") if p.strip()]
+
+# Record / field separators: can't appear in commit metadata, unlike "|"
+RS, FS = "\x1e", "\x1f"
+LOG_FORMAT = f"{RS}%H{FS}%h{FS}%an{FS}%aI{FS}%s{FS}%b{FS}"
+MAX_FILES_IN_CONTENT = 50
+
+
+def _parse_record(record: str, repo_name: str):
+    *fields, numstat = record.split(FS)
+    if len(fields) != 6:
+        return None
+    full_hash, short_hash, author, date, subject, body = fields
+    files = []
+    for line in numstat.strip().splitlines():
+        parts = line.split("\t")
+        if len(parts) == 3:
+            added, deleted, path = parts
+            # Binary files report "-" for both counts
+            files.append({
+                "path": path,
+                "added": int(added) if added.isdigit() else 0,
+                "deleted": int(deleted) if deleted.isdigit() else 0,
+            })
+    body = body.strip()
+    lines = [f"Commit {short_hash} in {repo_name} by {author} on {date}:", subject]
+    if body:
+        lines += ["", body]
+    if files:
+        lines += ["", "Files changed:"]
+        lines += [f"  {f['path']} (+{f['added']} -{f['deleted']})" for f in files[:MAX_FILES_IN_CONTENT]]
+        if len(files) > MAX_FILES_IN_CONTENT:
+            lines.append(f"  … and {len(files) - MAX_FILES_IN_CONTENT} more files")
+    return {
+        "id": full_hash,
+        "short_id": short_hash,
+        "summary": subject,
+        "body": body,
+        "author": author,
+        "date": date,
+        "files": files,
+        "repo": repo_name,
+        "source": "git",
+        "content": "\n".join(lines),
+    }
+
 
 class GitAdapter:
-    def __init__(self, repo_path: str = ".", since_hours: int = 24):
-        self.repo_path = repo_path
+    """
+    Commits from one or more Git repositories.
+
+    Each repository has a cursor (the last ingested commit) stored in
+    `cursor_path`, so a run only reads commits made since the previous one;
+    without a cursor the last `since_hours` are read. Repositories are read
+    in parallel with `git -C` and `git log` output is parsed as it streams.
+    """
+
+    def __init__(self, repo_path=".", since_hours: int = 24, cursor_path: str = GIT_CURSOR_PATH,
+                 max_workers: int = 4, advance: bool = True):
+        self.repo_paths = [repo_path] if isinstance(repo_path, str) else list(repo_path)
         self.since = datetime.now() - timedelta(hours=since_hours)
+        self.cursor_path = cursor_path
+        self.max_workers = max_workers
+        # When False, cursors move only on save_cursor() (after the entries are stored)
+        self.advance = advance
+        self._pending = {}
+
+    # --- cursor ---------------------------------------------------------------
+    def _load_cursors(self) -> dict:
+        return load_json(self.cursor_path)
+
+    def save_cursor(self):
+        """Persist the newest commit seen for each repository by the last fetch."""
+        if not self._pending:
+            return
+        update_json(self.cursor_path, lambda cursors: cursors.update(self._pending))
+        self._pending = {}
+
+    # --- git ------------------------------------------------------------------
+    def _git(self, repo: str, *args) -> subprocess.CompletedProcess:
+        return subprocess.run(["git", "-C", repo, *args], capture_output=True, text=True)
+
+    def _has_commit(self, repo: str, rev: str) -> bool:
+        return self._git(repo, "cat-file", "-e", f"{rev}^{{commit}}").returncode == 0
+
+    def iter_commits(self, repo: str, cursor: str = None):
+        """Yield commit entries newest first, parsing `git log` while it runs."""
+        repo_name = os.path.basename(os.path.abspath(repo))
+        args = ["git", "-C", repo, "log", f"--pretty=format:{LOG_FORMAT}", "--numstat", "--date=iso"]
+        if cursor:
+            args.append(f"{cursor}..HEAD")
+        else:
+            args.append(f"--since={self.since.isoformat()}")
+
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, encoding="utf-8", errors="replace")
+        record = []
+        try:
+            for line in proc.stdout:
+                if line.startswith(RS) and record:
+                    entry = _parse_record("".join(record), repo_name)
+                    if entry:
+                        yield entry
+                    record = []
+                record.append(line.lstrip(RS) if line.startswith(RS) else line)
+            if record:
+                entry = _parse_record("".join(record), repo_name)
+                if entry:
+                    yield entry
+        finally:
+            proc.stdout.close()
+            stderr = proc.stderr.read()
+            proc.stderr.close()
+            if proc.wait() != 0 and "does not have any commits" not in stderr:
+                print(f"⚠️ git log failed in {repo}: {stderr.strip()}")
+
+    def _fetch_repo(self, repo: str, cursors: dict) -> list:
+        key = os.path.abspath(repo)
+        cursor = cursors.get(key)
+        if cursor and not self._has_commit(repo, cursor):
+            print(f"⚠️ Cursor {cursor[:8]} not found in {repo} (history rewritten?) — reading by date instead")
+            cursor = None
+        entries = list(self.iter_commits(repo, cursor))
+        if entries:
+            self._pending[key] = entries[0]["id"]
+        return entries
 
     def fetch_entries(self):
-        os.chdir(self.repo_path)
-        result = subprocess.run(
-            ["git", "log", f'--since="{self.since.isoformat()}"', "--pretty=format:%h|%s|%an|%ad", "--date=iso"],
-            capture_output=True,
-            text=True,
-        )
-        entries = []
-        for line in result.stdout.splitlines():
-            parts = line.split("|")
-            if len(parts) >= 4:
-                entries.append({
-                    "id": parts[0],
-                    "summary": parts[1],
-                    "author": parts[2],
-                    "date": parts[3],
-                    "source": "git"
-                })
-        return entries
\ No newline at end of file
+        cursors = self._load_cursors()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            per_repo = list(pool.map(lambda repo: self._fetch_repo(repo, cursors), self.repo_paths))
+        if self.advance:
+            self.save_cursor()
+        return [entry for entries in per_repo for entry in entries]
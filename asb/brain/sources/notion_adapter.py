@@ -1,17 +1,178 @@
 from notion_client import Client
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
 import os
+import random
+import time
+from asb.brain.utils import load_json, update_json
+
+load_dotenv()
+
+NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
+# Point the client at another server (e.g. a local fake Notion API in tests)
+NOTION_BASE_URL = os.getenv("NOTION_BASE_URL")
+NOTION_STATE_PATH = os.getenv("NOTION_STATE_PATH", "./data/cursors/notion.json")
+
+RETRY_STATUSES = (409, 429, 500, 502, 503, 504)
+MAX_BLOCK_DEPTH = 3
+
+
+def _plain_text(rich_text) -> str:
+    return "".join(part.get("plain_text", "") for part in rich_text or [])
+
+
+def page_title(page: dict) -> str:
+    for prop in page.get("properties", {}).values():
+        if prop.get("type") == "title":
+            return _plain_text(prop.get("title")) or "Untitled"
+    return "Untitled"
+
+
+def block_text(block: dict) -> str:
+    """Plain text of one block (empty for blocks without rich text, e.g. images or dividers)."""
+    body = block.get(block.get("type"), {}) or {}
+    text = _plain_text(body.get("rich_text"))
+    if block.get("type") == "to_do":
+        text = ("[x] " if body.get("checked") else "[ ] ") + text
+    elif block.get("type") in ("bulleted_list_item", "numbered_list_item"):
+        text = "- " + text
+    elif block.get("type", "").startswith("heading_"):
+        text = "#" * int(block["type"][-1]) + " " + text
+    return text
+
 
 class NotionAdapter:
-    def __init__(self, db_id: str, api_key: str = None):
-        self.api_key = api_key or os.getenv("NOTION_API_KEY")
-        self.client = Client(auth=self.api_key)
-        self.db_id = db_id
+    """
+    Pages of a Notion database, with their block content.
+
+    Only pages edited since the stored `last_edited_time` high-water mark are
+    fetched (all pages on the first run); result pages are followed through
+    `next_cursor`. Page bodies are fetched concurrently, and calls that hit
+    Notion's rate limit or a transient error are retried with backoff
+    (honouring Retry-After). Pass `client` to use any object with the
+    notion_client interface.
+    """
+
+    def __init__(self, db_id: str = None, api_key: str = None, client=None,
+                 state_path: str = NOTION_STATE_PATH, max_workers: int = 4,
+                 max_retries: int = 5, advance: bool = True):
+        self.db_id = db_id or NOTION_DATABASE_ID
+        if not self.db_id:
+            raise ValueError("NotionAdapter needs a database id (argument or NOTION_DATABASE_ID).")
+        if client is None:
+            self.api_key = api_key or os.getenv("NOTION_API_KEY")
+            options = {"base_url": NOTION_BASE_URL} if NOTION_BASE_URL else {}
+            client = Client(auth=self.api_key, **options)
+        self.client = client
+        self.state_path = state_path
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        # With advance=False, ContextIngestor calls save_cursor() once the pages are stored
+        self.advance = advance
+        self._pending = None
+        self._data_source_id = None
+
+    # --- high-water mark ------------------------------------------------------
+    def _load_state(self) -> dict:
+        return load_json(self.state_path)
+
+    def save_cursor(self):
+        """Persist the newest last_edited_time seen by the last fetch."""
+        if not self._pending:
+            return
+        def advance(state):
+            state[self.db_id] = max(self._pending, state.get(self.db_id, ""))
+
+        update_json(self.state_path, advance)
+        self._pending = None
+
+    # --- API calls --------------------------------------------------------------
+    def _call(self, fn, **kwargs):
+        """Call the Notion API, backing off on rate limits and transient failures."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn(**kwargs)
+            except Exception as e:
+                status = getattr(e, "status", None)
+                transient = status in RETRY_STATUSES or type(e).__name__ == "RequestTimeoutError"
+                if not transient or attempt == self.max_retries:
+                    raise
+                retry_after = (getattr(e, "headers", None) or {}).get("retry-after")
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = min(30.0, 0.5 * 2 ** attempt) * (0.5 + random.random())
+                time.sleep(delay)
+
+    def _query(self, **kwargs):
+        # notion-client >= 3 queries data sources; older versions query databases
+        query = getattr(self.client.databases, "query", None)
+        if query is not None:
+            return self._call(query, database_id=self.db_id, **kwargs)
+        if self._data_source_id is None:
+            # A database id is not a data source id: look up the database's (first) data source
+            database = self._call(self.client.databases.retrieve, database_id=self.db_id)
+            self._data_source_id = database["data_sources"][0]["id"]
+        return self._call(self.client.data_sources.query, data_source_id=self._data_source_id, **kwargs)
+
+    def iter_pages(self, since: str = None):
+        """Yield database pages (oldest edit first), following pagination."""
+        kwargs = {"page_size": 100, "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]}
+        if since:
+            # Notion timestamps are minute-granular, so boundary pages come back again;
+            # the ingestor skips them by content hash.
+            kwargs["filter"] = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}}
+        cursor = None
+        while True:
+            response = self._query(**kwargs, **({"start_cursor": cursor} if cursor else {}))
+            yield from response.get("results", [])
+            if not response.get("has_more"):
+                break
+            cursor = response.get("next_cursor")
+
+    def page_text(self, block_id: str, depth: int = 0) -> str:
+        """All text under a block, children indented, following pagination."""
+        lines, cursor = [], None
+        while True:
+            kwargs = {"block_id": block_id, "page_size": 100}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            response = self._call(self.client.blocks.children.list, **kwargs)
+            for block in response.get("results", []):
+                text = block_text(block)
+                if text:
+                    lines.append("  " * depth + text)
+                if block.get("has_children") and depth + 1 < MAX_BLOCK_DEPTH:
+                    child = self.page_text(block["id"], depth + 1)
+                    if child:
+                        lines.append(child)
+            if not response.get("has_more"):
+                break
+            cursor = response.get("next_cursor")
+        return "\n".join(lines)
+
+    def _entry(self, page: dict) -> dict:
+        title = page_title(page)
+        body = self.page_text(page["id"])
+        content = f"Title: {title}\nLast edited: {page['last_edited_time']}"
+        if body:
+            content += "\n\n" + body
+        return {
+            "source": "notion",
+            "id": page["id"],
+            "title": title,
+            "url": page.get("url"),
+            "last_edited": page["last_edited_time"],
+            "content": content,
+        }
 
     def fetch_entries(self):
-        pages = self.client.databases.query(database_id=self.db_id)["results"]
-        entries = []
-        for page in pages:
-            title = page["properties"]["Name"]["title"][0]["plain_text"] if page["properties"]["Name"]["title"] else "Untitled"
-            content = f"Title: {title}\nLast edited: {page['last_edited_time']}"
-            entries.append({"source": "notion", "content": content})
-        return entries
\ No newline at end of file
+        since = self._load_state().get(self.db_id)
+        pages = [p for p in self.iter_pages(since) if not p.get("archived") and not p.get("in_trash")]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            entries = list(pool.map(self._entry, pages))
+        if pages:
+            self._pending = max(p["last_edited_time"] for p in pages)
+            if self.advance:
+                self.save_cursor()
+        return entries
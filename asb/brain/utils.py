@@ -0,0 +1,54 @@
+# asb/brain/utils.py
+"""Persistence helpers shared by manifests, cursors, checkpoints and the SQLite stores."""
+import os
+import json
+import sqlite3
+import threading
+
+_json_lock = threading.Lock()
+
+
+def load_json(path: str) -> dict:
+    """The JSON object stored at `path`, or {} when it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def atomic_write(path: str, write, suffix: str = ".tmp"):
+    """Call `write(tmp_path)`, then rename the result over `path` so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + suffix
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_json(path: str, data, **dump_kwargs):
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, **dump_kwargs)
+
+    atomic_write(path, write)
+
+
+def update_json(path: str, update):
+    """Read-modify-write the JSON object at `path`: `update(data)` mutates it in place."""
+    with _json_lock:
+        data = load_json(path)
+        update(data)
+        save_json(path, data, indent=1, sort_keys=True)
+
+
+def open_sqlite(path: str) -> sqlite3.Connection:
+    """
+    WAL-mode connection that may be shared across threads (callers guard it
+    with their own lock). WAL lets readers, such as the dashboard, run while
+    the CLI or scheduler writes.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
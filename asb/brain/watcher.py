@@ -0,0 +1,130 @@
+# asb/brain/watcher.py
+import os
+import time
+import logging
+import threading
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from asb.brain import services
+
+log = logging.getLogger(__name__)
+
+NOTE_EXTENSIONS = (".md", ".txt")
+
+
+class _PathCollector(FileSystemEventHandler):
+    """Collects the paths touched by filesystem events; the watcher drains them."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.paths = set()
+        self.first_event = None
+        self.last_event = None
+
+    def _add(self, path):
+        name = os.path.basename(path)
+        # Editors' swap / backup / temp files
+        if name.startswith((".", "~")) or not name.endswith(NOTE_EXTENSIONS):
+            return
+        now = time.monotonic()
+        with self.lock:
+            self.paths.add(path)
+            self.first_event = self.first_event or now
+            self.last_event = now
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in ("created", "modified", "deleted", "moved"):
+            return
+        self._add(os.fsdecode(event.src_path))
+        if event.event_type == "moved":
+            self._add(os.fsdecode(event.dest_path))
+
+    def drain(self, debounce: float, max_wait: float):
+        """Return the collected paths once events have been quiet for `debounce` seconds (or after `max_wait`)."""
+        now = time.monotonic()
+        with self.lock:
+            if not self.paths:
+                return []
+            if now - self.last_event < debounce and now - self.first_event < max_wait:
+                return []
+            paths = sorted(self.paths)
+            self.paths.clear()
+            self.first_event = self.last_event = None
+        return paths
+
+
+class NoteWatcher:
+    """
+    Keeps vector memory and the knowledge graph in sync with the notes folders.
+
+    Filesystem events are debounced (a burst of saves becomes one update) and
+    only the affected files are re-ingested, `batch_size` files at a time.
+    Deleted files have their vectors and graph edges removed.
+    """
+
+    def __init__(self, notes_dir: str = None, external_dir: str = "./data/external_notes",
+                 debounce: float = 2.0, max_wait: float = 10.0, batch_size: int = 16):
+        from asb.brain.graph import KnowledgeGraph
+        from asb.brain.ingestion import ContextIngestor
+        from asb.brain.sources.files_adapter import FilesAdapter
+
+        self.memory = services.get_memory()
+        self.notes_dir = os.path.abspath(notes_dir or self.memory.data_dir)
+        self.external_dir = os.path.abspath(external_dir)
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.batch_size = batch_size
+        self.graph = KnowledgeGraph(self.notes_dir)
+        self.files = FilesAdapter(external_dir)
+        self.ingestor = ContextIngestor(adapters=[self.files])
+        self.collector = _PathCollector()
+
+    def catch_up(self):
+        """Incremental sync of anything changed while nobody was watching."""
+        self.memory.ingest_notes()
+        self.graph.build()
+        self.ingestor.forget_relative_file_ids()
+        paths = set(self.ingestor.stored_paths(self.files))
+        if os.path.isdir(self.external_dir):
+            paths.update(os.path.join(self.external_dir, f) for f in os.listdir(self.external_dir))
+        # Stored paths that no longer exist are removed from memory and the manifest
+        self.ingestor.ingest_files(sorted(paths), self.files)
+
+    def process(self, paths: list[str]):
+        notes = [p for p in paths if os.path.dirname(os.path.abspath(p)) == self.notes_dir]
+        external = [p for p in paths if os.path.dirname(os.path.abspath(p)) == self.external_dir]
+        for i in range(0, len(notes), self.batch_size):
+            batch = notes[i:i + self.batch_size]
+            counts = self.memory.ingest_paths(batch)
+            graph_changed = sum(self.graph.update_note(p) for p in batch)
+            log.info(f"👀 Notes: {counts['added']} added, {counts['updated']} updated, "
+                     f"{counts['removed']} removed ({graph_changed} graph updates)")
+        for i in range(0, len(external), self.batch_size):
+            counts = self.ingestor.ingest_files(external[i:i + self.batch_size], self.files)
+            log.info(f"👀 External notes: {counts['added']} added, {counts['updated']} updated, "
+                     f"{counts['removed']} removed")
+
+    def run(self, catch_up: bool = True, poll: float = 0.25):
+        """Watch until interrupted (Ctrl+C)."""
+        if catch_up:
+            self.catch_up()
+        observer = Observer()
+        for folder in (self.notes_dir, self.external_dir):
+            os.makedirs(folder, exist_ok=True)
+            observer.schedule(self.collector, folder, recursive=False)
+        observer.start()
+        log.info(f"👀 Watching {self.notes_dir} and {self.external_dir} (debounce {self.debounce}s)")
+        try:
+            while True:
+                time.sleep(poll)
+                paths = self.collector.drain(self.debounce, self.max_wait)
+                if paths:
+                    try:
+                        self.process(paths)
+                    except Exception as e:
+                        log.exception(f"⚠️ Live ingestion failed: {e}")
+        except KeyboardInterrupt:
+            log.info("🧩 Manual interrupt — stopping watcher.")
+        finally:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,100 @@
+# asb/brain/web_search.py
+import os
+import re
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from asb.brain.utils import open_sqlite
+
+load_dotenv()
+
+# Any endpoint that takes ?q=&api_key= and answers with {"organic_results": [{"snippet": ...}]}
+SEARCH_ENDPOINT = os.getenv("SEARCH_ENDPOINT", "https://serpapi.com/search.json")
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "./data/cache/search.db")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))  # seconds
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive form of a query (the cache key)."""
+    return " ".join(re.findall(r"\w+", query.lower()))
+
+
+class WebSearch:
+    """
+    Web search client with a pooled keep-alive session and an on-disk result cache.
+
+    Results are cached per (endpoint, normalised query) for `ttl` seconds.
+    The client is safe to share between threads.
+    """
+
+    def __init__(self, endpoint: str = SEARCH_ENDPOINT, api_key: str = None,
+                 cache_path: str = SEARCH_CACHE_PATH, ttl: float = SEARCH_CACHE_TTL,
+                 pool_size: int = 16, timeout: float = 10):
+        self.endpoint = endpoint
+        self.api_key = api_key if api_key is not None else os.getenv("SERPER_API_KEY")
+        self.ttl = ttl
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.lock = threading.Lock()
+        self.conn = open_sqlite(cache_path)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_cache (
+            endpoint TEXT NOT NULL,
+            query TEXT NOT NULL,
+            results TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (endpoint, query)
+        ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def _cached(self, key: str):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT results, fetched_at FROM search_cache WHERE endpoint = ? AND query = ?",
+                (self.endpoint, key),
+            ).fetchone()
+        if row and time.time() - row[1] <= self.ttl:
+            return json.loads(row[0])
+        return None
+
+    def search(self, query: str, limit: int = 5) -> list[str]:
+        """Return up to `limit` result snippets for `query`."""
+        key = normalize_query(query)
+        snippets = self._cached(key)
+        if snippets is not None:
+            self.hits += 1
+            return snippets[:limit]
+        self.misses += 1
+
+        response = self.session.get(
+            self.endpoint, params={"q": query, "api_key": self.api_key}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+        snippets = [r.get("snippet", "") for r in data.get("organic_results", [])[:limit]]
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_cache (endpoint, query, results, fetched_at) VALUES (?, ?, ?, ?)",
+                (self.endpoint, key, json.dumps(snippets), time.time()),
+            )
+            self.conn.commit()
+        return snippets
+
+    def close(self):
+        self.session.close()
+        self.conn.close()
@@ -1,9 +1,7 @@
 # asb/dashboard.py
 import os
-import pandas as pd
 import streamlit as st
 import plotly.express as px
-from asb.brain.insight_db import InsightDB
 
 st_autorefresh = st.sidebar.checkbox("🔁 Auto-refresh every 60s", value=False)
 if st_autorefresh:
@@ -15,76 +13,45 @@ st.title("🧠 Agentic Second Brain Dashboard")
 st.caption("Visualizing reflections, insights, and cognitive evolution")
 
 # ---- Load Insight Data ----
-db_path = "./data/insights.db"
-if not os.path.exists(db_path):
+from asb import dashboard_data as data
+
+if not os.path.exists(data.INSIGHTS_DB_PATH):
     st.error("No insights database found. Run some reflections or research first.")
     st.stop()
 
-db = InsightDB(db_path)
-conn = db.conn
-df = pd.read_sql_query("SELECT * FROM insights ORDER BY date DESC", conn)
-conn.close()
+# Cheap version reads; cached queries below only re-run when these change
+version = data.insights_version()
 
 # ---- Sidebar Filters ----
-topics = ["All"] + sorted(df["topic"].dropna().unique().tolist())
+topics = ["All"] + data.topics(version)
 selected_topic = st.sidebar.selectbox("Filter by Topic", topics)
-if selected_topic != "All":
-    df = df[df["topic"] == selected_topic]
+topic = None if selected_topic == "All" else selected_topic
 
-st.sidebar.info(f"🗂️ Showing {len(df)} insights")
+total = data.insight_count(version, topic)
+st.sidebar.info(f"🗂️ {total} insights")
 
 # ---- Recent Insights ----
 st.subheader("🧩 Recent Insights")
-for _, row in df.head(5).iterrows():
+page_size = st.sidebar.selectbox("Insights per page", [5, 10, 25, 50], index=0)
+pages = max(1, -(-total // page_size))
+page = st.sidebar.number_input("Page", min_value=1, max_value=pages, value=1, step=1) - 1
+df = data.insights_page(version, topic, page, page_size)
+st.caption(f"Page {page + 1} of {pages}")
+for _, row in df.iterrows():
     with st.expander(f"**{row['topic']}** — {row['question']} ({row['date']})"):
         st.write(row["answer"])
         if row.get("tags"):
             st.caption(f"🏷️ {row['tags']}")
 
 # ---- Reflection Metrics ----
-metrics_path = "./data/metrics/self_scores.csv"
+from asb.brain.score_store import SCORES_DB_PATH
 
-if os.path.exists(metrics_path):
+if os.path.exists(SCORES_DB_PATH) or os.path.exists("./data/metrics/self_scores.csv"):
     try:
-        # Flexible parse
-        metrics = pd.read_csv(
-            metrics_path,
-            engine="python",
-            on_bad_lines="skip",
-            header=None
-        )
-
-        # Define safe column names dynamically
-        default_cols = [
-            "timestamp",
-            "file",
-            "clarity",
-            "novelty",
-            "actionability",
-            "redundancy",
-            "topics",
-            "suggestions"
-        ]
-
-        # Trim or extend column names based on file width
-        num_cols = len(metrics.columns)
-        metrics.columns = default_cols[:num_cols]
-
-        # 🧩 Try to coerce numeric columns if they exist
-        for col in ["clarity", "novelty", "actionability", "redundancy"]:
-            if col in metrics.columns:
-                metrics[col] = pd.to_numeric(metrics[col], errors="coerce")
-
-        # Drop rows missing all numeric fields
-        available_cols = [c for c in ["clarity", "novelty", "actionability", "redundancy"] if c in metrics.columns]
-        if available_cols:
-            metrics = metrics.dropna(subset=available_cols, how="all")
-
-        # Limit to most recent 50 entries
-        metrics = metrics.tail(50)
-
+        # Scores are parsed into typed columns at evaluation time
+        metrics = data.recent_scores(data.scores_version(), 50)
     except Exception as e:
-        st.error(f"Failed to parse metrics file: {e}")
+        st.error(f"Failed to load metrics: {e}")
         metrics = None
 else:
     metrics = None
@@ -112,12 +79,9 @@ if metrics is not None and not metrics.empty:
 
 # ---- Reflection Timeline ----
 st.subheader("🕰️ Reflection Timeline")
-timeline_dir = "./data/reflections"
+timeline_dir = data.REFLECTIONS_DIR
 if os.path.exists(timeline_dir):
-    reflections = sorted(
-        [f for f in os.listdir(timeline_dir) if f.endswith(".md")],
-        reverse=True
-    )
+    reflections = data.reflection_files(data.reflections_version())
     selected_reflection = st.selectbox("Select a reflection", reflections)
     if selected_reflection:
         with open(os.path.join(timeline_dir, selected_reflection)) as f:
@@ -126,10 +90,8 @@ else:
     st.warning("No reflections found. Run `uv run asb reflect` to create one.")
 
 # ---- Tags Overview ----
-if "tags" in df.columns:
-    tag_counts = (
-        df["tags"].dropna().str.split(",").explode().str.strip().value_counts().head(15)
-    )
+tag_counts = data.tag_counts(version, topic, 15)
+if not tag_counts.empty:
     st.subheader("🏷️ Top Tags")
     st.bar_chart(tag_counts)
 
@@ -138,47 +100,27 @@ st.sidebar.success("✅ Dashboard ready — live view of your Second Brain.")
 
 
 # ---- Semantic Search ----
-from asb.brain.memory import Memory
-from asb.brain.agent import ASBAgent
-
 st.markdown("---")
 st.subheader("🔍 Semantic Search — Ask Your Brain")
 
 query = st.text_input("Ask anything you've reflected, researched, or learned:")
 if query:
-    memory = Memory()
-    results = memory.collection.query(query_texts=[query], n_results=3)
-    if results["documents"]:
+    documents = data.semantic_search(data.memory_version(), query, 3)
+    if documents:
         st.success("Top related insights:")
-        for i, doc in enumerate(results["documents"][0]):
+        for i, doc in enumerate(documents):
             st.write(f"**{i+1}.** {doc}")
     else:
         st.warning("No semantic matches found.")
 
 
 # ---- Knowledge Graph Visualization ----
-import networkx as nx
-from pyvis.network import Network
-import tempfile
-
 st.markdown("---")
 st.subheader("🕸 Knowledge Graph")
 
-if not df.empty:
-    G = nx.Graph()
-    for _, row in df.iterrows():
-        topic = row["topic"] or "misc"
-        question = row["question"][:80]
-        G.add_node(topic, color="#1f77b4", size=20)
-        G.add_node(question, color="#ff7f0e", size=10)
-        G.add_edge(topic, question)
-
-    net = Network(height="600px", width="100%", bgcolor="#111", font_color="white")
-    net.from_nx(G)
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as tmp_file:
-        net.save_graph(tmp_file.name)
-        st.components.v1.html(open(tmp_file.name, "r", encoding="utf-8").read(), height=600)
+if total:
+    graph_limit = st.slider("Insights in graph (most recent)", 50, 1000, 200, step=50)
+    st.components.v1.html(data.graph_html(version, topic, graph_limit), height=600)
 else:
     st.info("No insights found for graph visualization.")
 
@@ -187,14 +129,13 @@ else:
 st.markdown("---")
 st.subheader("📈 Insight Analytics")
 
-if not df.empty:
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    daily_counts = df.groupby(df["date"].dt.date).size().reset_index(name="insights")
+if total:
+    daily_counts = data.daily_counts(version, topic)
     fig = px.bar(daily_counts, x="date", y="insights", title="Reflections & Insights Over Time")
     st.plotly_chart(fig, use_container_width=True)
 
-    top_topics = df["topic"].value_counts().head(10)
+    top_topics = data.topic_counts(version, 10)
     st.write("### 🔝 Top 10 Topics")
     st.bar_chart(top_topics)
 else:
-    st.warning("No insights to analyze yet.")
\ No newline at end of file
+    st.warning("No insights to analyze yet.")
@@ -0,0 +1,138 @@
+# asb/dashboard_data.py
+"""
+Data layer for the Streamlit dashboard.
+
+Connections and the vector memory are created once per server process
+(st.cache_resource). Query results are cached with st.cache_data and keyed
+on a version token of their source (the InsightDB and memory write counters,
+the score table's last id, file mtimes), so a rerun only hits SQLite / Chroma again
+after the underlying data actually changed.
+"""
+import os
+import pandas as pd
+import streamlit as st
+
+INSIGHTS_DB_PATH = "./data/insights.db"
+REFLECTIONS_DIR = "./data/reflections"
+SCORE_COLUMNS = ["timestamp", "file", "clarity", "novelty", "actionability", "redundancy", "topics", "suggestions"]
+INSIGHT_COLUMNS = ["id", "date", "topic", "question", "answer", "tags"]
+
+
+# --- shared resources ----------------------------------------------------------
+@st.cache_resource
+def insight_db():
+    from asb.brain.insight_db import InsightDB
+    return InsightDB(INSIGHTS_DB_PATH)
+
+
+@st.cache_resource
+def score_store():
+    from asb.brain.score_store import ScoreStore
+    return ScoreStore()
+
+
+@st.cache_resource
+def memory():
+    # One warm Memory (embedder, Chroma client, Ollama probe) per server process
+    from asb.brain import services
+    return services.get_memory()
+
+
+# --- version tokens -------------------------------------------------------------
+def insights_version() -> int:
+    return insight_db().version()
+
+
+def scores_version() -> int:
+    return score_store().version()
+
+
+def _mtimes(paths) -> tuple:
+    return tuple(sorted((p, os.stat(p).st_mtime_ns) for p in paths if os.path.exists(p)))
+
+
+def memory_version() -> int:
+    """Changes on every write to memory from any process (notes, sources, research results)."""
+    return memory().version()
+
+
+def reflections_version() -> tuple:
+    return _mtimes([REFLECTIONS_DIR])
+
+
+# --- cached queries ---------------------------------------------------------------
+# `version` arguments are never read: they only key the cache.
+@st.cache_data(max_entries=32)
+def topics(version) -> list[str]:
+    return sorted(t for t in insight_db().list_topics() if t)
+
+
+@st.cache_data(max_entries=64)
+def insight_count(version, topic: str = None) -> int:
+    return insight_db().count(topic)
+
+
+@st.cache_data(max_entries=256)
+def insights_page(version, topic: str = None, page: int = 0, page_size: int = 20) -> pd.DataFrame:
+    rows = insight_db().page(topic, limit=page_size, offset=page * page_size)
+    return pd.DataFrame(rows, columns=INSIGHT_COLUMNS)
+
+
+@st.cache_data(max_entries=64)
+def daily_counts(version, topic: str = None) -> pd.DataFrame:
+    return pd.DataFrame(insight_db().daily_counts(topic), columns=["date", "insights"])
+
+
+@st.cache_data(max_entries=16)
+def topic_counts(version, limit: int = 10) -> pd.Series:
+    rows = insight_db().topic_counts(limit)
+    return pd.Series({topic: n for topic, n in rows}, name="insights", dtype="int64")
+
+
+@st.cache_data(max_entries=64)
+def tag_counts(version, topic: str = None, limit: int = 15) -> pd.Series:
+    rows = insight_db().tag_counts(topic, limit)
+    return pd.Series({tag: n for tag, n in rows}, name="insights", dtype="int64")
+
+
+@st.cache_data(max_entries=8)
+def recent_scores(version, limit: int = 50) -> pd.DataFrame:
+    metrics = pd.DataFrame(score_store().recent(limit), columns=SCORE_COLUMNS)
+    return metrics.dropna(subset=["clarity", "novelty", "actionability", "redundancy"], how="all")
+
+
+@st.cache_data(max_entries=8)
+def reflection_files(version) -> list[str]:
+    if not os.path.isdir(REFLECTIONS_DIR):
+        return []
+    return sorted((f for f in os.listdir(REFLECTIONS_DIR) if f.endswith(".md")), reverse=True)
+
+
+@st.cache_data(max_entries=128)
+def semantic_search(version, query: str, top_k: int = 3) -> list[str]:
+    return memory().query(query, top_k=top_k)
+
+
+@st.cache_data(max_entries=16)
+def graph_html(version, topic: str = None, limit: int = 200) -> str:
+    """pyvis topic → question graph over the `limit` most recent insights."""
+    import tempfile
+    import networkx as nx
+    from pyvis.network import Network
+
+    G = nx.Graph()
+    for _, date, row_topic, question, _, _ in insight_db().page(topic, limit=limit):
+        row_topic = row_topic or "misc"
+        question = (question or "")[:80]
+        G.add_node(row_topic, color="#1f77b4", size=20)
+        G.add_node(question, color="#ff7f0e", size=10)
+        G.add_edge(row_topic, question)
+
+    net = Network(height="600px", width="100%", bgcolor="#111", font_color="white")
+    net.from_nx(G)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as tmp_file:
+        net.save_graph(tmp_file.name)
+    with open(tmp_file.name, encoding="utf-8") as f:
+        html = f.read()
+    os.remove(tmp_file.name)
+    return html
@@ -1,64 +1,107 @@
 # main.py
+# Commands import their dependencies when invoked, so lightweight commands
+# (logs, insights, ...) never load the LLM / vector-store stacks.
+# Measure with: python benchmarks/startup.py
 import typer
 from rich.console import Console
-from asb.brain.agent import ASBAgent
-from asb.brain.reflection import ReflectionEngine
-from asb.brain.graph import KnowledgeGraph
-from asb.brain.scheduler import start_daily_reflection
-from asb.brain.insight_db import InsightDB
+from asb.brain import services
 from asb.brain.logger import setup_logger
 from datetime import datetime, timedelta
-from asb.brain.sources.git_adapter import GitAdapter
-from asb.brain.sources.files_adapter import FilesAdapter
-from asb.brain.sources.notion_adapter import NotionAdapter
-from asb.brain.ingestion import ContextIngestor
-from asb.brain.memory_compressor import MemoryCompressor
 import glob
-from asb.brain.scheduler import start_weekly_compression
-from asb.brain.self_evaluator import SelfEvaluator
-from asb.brain.research_agent import ResearchAgent
-from asb.brain.automation_graph import workflow
 log = setup_logger()
 
 app = typer.Typer()
 console = Console()
-agent = ASBAgent()
 
 @app.command()
 def ingest():
     console.print("[green]Ingesting notes into memory...[/green]")
-    agent.memory.ingest_notes()
+    services.get_memory().ingest_notes()
+    from asb.brain.graph import KnowledgeGraph
+    KnowledgeGraph().build()
     console.print("[cyan]Done![/cyan]")
 
 @app.command()
-def ask(query: str):
+def watch(debounce: float = typer.Option(2.0, "--debounce", help="Seconds of quiet before a burst of edits is ingested"),
+          catch_up: bool = typer.Option(True, "--catch-up/--no-catch-up", help="Sync changes made while not watching first")):
+    """Keep memory and the knowledge graph live-updated as notes change."""
+    from asb.brain.watcher import NoteWatcher
+    console.print("[green]Watching notes for changes (Ctrl+C to stop)...[/green]")
+    NoteWatcher(debounce=debounce).run(catch_up=catch_up)
+
+@app.command()
+def ask(query: str,
+        stream: bool = typer.Option(True, "--stream/--no-stream", help="Print the answer as it is generated"),
+        no_cache: bool = typer.Option(False, "--no-cache", help="Skip the LLM response cache for this question"),
+        source: str = typer.Option(None, "--source", "-s", help="Only use context from this source (notes, git, notion, local_file, auto_research)"),
+        since: str = typer.Option(None, "--since", help="Only use context dated on/after this ISO date"),
+        until: str = typer.Option(None, "--until", help="Only use context dated on/before this ISO date (a bare date includes that whole day)")):
+    from asb.brain.memory import as_timestamp
+    for flag, value in (("--since", since), ("--until", until)):
+        try:
+            as_timestamp(value)
+        except ValueError:
+            console.print(f"[red]{flag} must be an ISO date such as 2024-05-01 or 2024-05-01T09:30, got '{value}'.[/red]")
+            raise typer.Exit(1)
     console.print(f"[bold blue]You:[/bold blue] {query}")
-    response = agent.ask(query)
-    console.print(f"[bold green]ASB:[/bold green] {response}")
+    agent = services.get_agent()
+    filters = {"source": source, "since": since, "until": until}
+    if not stream:
+        response = agent.ask(query, use_cache=not no_cache, filters=filters)
+        console.print(f"[bold green]ASB:[/bold green] {response}")
+        return
+    console.print("[bold green]ASB:[/bold green] ", end="")
+    for token in agent.ask_stream(query, use_cache=not no_cache, filters=filters):
+        console.print(token, end="", markup=False, highlight=False, soft_wrap=True)
+    console.print()
+    ttft = agent.cognition.last_ttft
+    if ttft is not None:
+        console.print(f"[dim]first token after {ttft:.2f}s[/dim]")
 
 @app.command()
 def reflect():
     """Generate a reflection summary of your notes."""
+    from asb.brain.reflection import ReflectionEngine
     engine = ReflectionEngine()
     summary = engine.reflect()
     console.print(f"[bold green]{summary}[/bold green]")
 
 @app.command()
-def related(concept: str):
+def related(concept: str,
+            top: int = typer.Option(10, "--top", "-k", help="Number of related concepts"),
+            method: str = typer.Option("pmi", "--method", "-m", help="Ranking: pmi, tfidf or count"),
+            refresh: bool = typer.Option(False, "--refresh", help="Sync changed notes into the graph first")):
     """Find concepts related to a keyword."""
+    from asb.brain.graph import KnowledgeGraph
     graph = KnowledgeGraph()
-    graph.build()
-    related = graph.related(concept)
-    console.print(f"[yellow]{concept}[/yellow] → {related}")
+    if refresh or graph.is_empty():
+        graph.build()
+    related = graph.related(concept, k=top, method=method)
+    ranked = ", ".join(f"{word} ({score:.2f})" for word, score in related)
+    console.print(f"[yellow]{concept}[/yellow] → {ranked or '[]'}")
 
 @app.command()
 def schedule(timeout_hours: float = typer.Option(1.0, "--timeout-hours", "-t", help="How many hours to run before stopping")):
     """Start the daily reflection job with an optional timeout (in hours)."""
+    from asb.brain.scheduler import start_daily_reflection
     start_daily_reflection(timeout_hours)
 
+@app.command()
+def daemon(job: list[str] = typer.Option(None, "--job", "-j", help="Only run this job (repeat for several): reflection, compression, research, automation"),
+           timeout_hours: float = typer.Option(None, "--timeout-hours", "-t", help="Stop after this many hours"),
+           reset: bool = typer.Option(False, "--reset", help="Re-create the job schedules from their defaults")):
+    """Run all scheduled jobs in one process with a persistent job store."""
+    from asb.brain.scheduler import run_daemon
+    try:
+        run_daemon(job, timeout_hours, reset)
+    except (RuntimeError, ValueError) as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
 @app.command()
 def insights(topic: str):
     """Query past insights related to a topic."""
+    from asb.brain.insight_db import InsightDB
     db = InsightDB()
     rows = db.query_by_topic(topic)
     if not rows:
@@ -69,6 +112,31 @@ def insights(topic: str):
         console.print(f"[yellow]{date}[/yellow]: {q}")
         console.print(f"[green]{a}[/green]\nTags: {tags}\n")
 
+@app.command()
+def search(query: str, limit: int = typer.Option(10, "--limit", "-n", help="Maximum number of results")):
+    """Full-text search over past insights (ranked)."""
+    from asb.brain.insight_db import InsightDB
+    rows = InsightDB().search(query, limit)
+    if not rows:
+        console.print(f"[red]No insights match '{query}'.[/red]")
+        return
+    for date, topic, question, snippet, tags, score in rows:
+        console.print(f"[yellow]{date}[/yellow] [cyan]{topic}[/cyan]: {question}")
+        console.print(f"[green]{snippet}[/green]\nTags: {tags}\n")
+
+@app.command()
+def stats(days: int = typer.Option(7, "--days", "-d", help="Days of activity to show"),
+          top: int = typer.Option(10, "--top", "-k", help="Number of topics / tags to list"),
+          topic: str = typer.Option(None, "--topic", "-t", help="Only this topic's tags and activity")):
+    """Insight counts per day, topic and tag."""
+    from asb.brain.insight_db import InsightDB
+    db = InsightDB()
+    console.print(f"[bold cyan]🧠 {db.count(topic)} insights{f' on {topic}' if topic else ''}[/bold cyan]")
+    console.print(f"[bold]Last {days} days:[/bold] " + ", ".join(f"{day} ({n})" for day, n in db.daily_counts(topic, days)))
+    if not topic:
+        console.print("[bold]Top topics:[/bold] " + ", ".join(f"{t} ({n})" for t, n in db.topic_counts(top)))
+    console.print("[bold]Top tags:[/bold] " + ", ".join(f"{t} ({n})" for t, n in db.tag_counts(topic, top)))
+
 @app.command()
 def logs(days: int = typer.Option(1, "--days", "-d", help="Days of logs to view")):
     """View or summarize recent ASB logs."""
@@ -86,41 +154,43 @@ def logs(days: int = typer.Option(1, "--days", "-d", help="Days of logs to view"
 @app.command()
 def log_reflect(days: int = typer.Option(1, "--days", "-d", help="Days of logs to analyze")):
     """Ask ASB to analyze its recent log activity."""
-    from asb.brain.agent import ASBAgent
-    import glob
     cutoff_logs = sorted(glob.glob("./data/logs/asb_*.log"))[-days:]
     text = ""
     for file in cutoff_logs:
         with open(file) as f:
             text += f.read() + "\n"
-    agent = ASBAgent()
+    agent = services.get_agent()
     summary = agent.ask(f"Summarize key activities, successes, and issues in these logs:\n{text}")
     console.print(f"[green]{summary}[/green]")
 
 @app.command()
-def ingest_git(repo_path: str = typer.Option("./data/external_notes", "--repo-path", "-r", help="Path to Git repository")):
-    """Ingest from Git commits."""
-    adapter = GitAdapter(repo_path)
-    entries = adapter.fetch_entries()
-    console.print(f"[green]Ingested {len(entries)} entries from Git.[/green]")
+def ingest_git(repo_path: list[str] = typer.Option(["./data/external_notes"], "--repo-path", "-r", help="Git repository (repeat for several)")):
+    """Ingest new commits (since the last run) from one or more Git repositories."""
+    from asb.brain.ingestion import ContextIngestor
+    from asb.brain.sources.git_adapter import GitAdapter
+    summary = ContextIngestor(adapters=[GitAdapter(repo_path, advance=False)]).ingest_all()
+    console.print(f"[green]Ingested {summary['git']['added'] + summary['git']['updated']} entries from Git.[/green]")
 
 @app.command()
 def ingest_files(repo_path: str = typer.Option("./data/external_notes", "--repo-path", "-r", help="Path to Git repository")):
     """Ingest from local files."""
+    from asb.brain.sources.files_adapter import FilesAdapter
     adapter = FilesAdapter(repo_path)
     entries = adapter.fetch_entries()
     console.print(f"[green]Ingested {len(entries)} entries from files.[/green]")
 
 @app.command()
-def ingest_notion():
-    """Ingest from Notion."""
-    adapter = NotionAdapter()
-    entries = adapter.fetch_entries()
-    console.print(f"[green]Ingested {len(entries)} entries from Notion.[/green]")
+def ingest_notion(db_id: str = typer.Option(None, "--db-id", help="Notion database id (default: NOTION_DATABASE_ID)")):
+    """Ingest pages edited since the last run from a Notion database."""
+    from asb.brain.ingestion import ContextIngestor
+    from asb.brain.sources.notion_adapter import NotionAdapter
+    summary = ContextIngestor(adapters=[NotionAdapter(db_id, advance=False)]).ingest_all()
+    console.print(f"[green]Ingested {summary['notion']['added'] + summary['notion']['updated']} entries from Notion.[/green]")
 
 @app.command()
 def ingest_all():
     """Ingest from all connected sources (Git, local notes, etc.)."""
+    from asb.brain.ingestion import ContextIngestor
     ingestor = ContextIngestor()
     ingestor.ingest_all()
 
@@ -128,33 +198,45 @@ def ingest_all():
 @app.command()
 def compress(days: int = typer.Option(14, "--days", "-d", help="Compress reflections older than N days")):
     """Summarize and compress old reflections into key insights."""
+    from asb.brain.memory_compressor import MemoryCompressor
     compressor = MemoryCompressor()
     compressor.compress_old_reflections(days)
 
 @app.command()
 def schedule_compression():
     """Start the weekly compression job."""
+    from asb.brain.scheduler import start_weekly_compression
     start_weekly_compression()
 
 @app.command()
 def evaluate(days: int = typer.Option(7, "--days", "-d", help="Days of reflections to evaluate")):
     """Evaluate recent reflections for quality & novelty."""
+    from asb.brain.self_evaluator import SelfEvaluator
     evaluator = SelfEvaluator()
     evaluator.evaluate_recent_reflections(days)
 
 @app.command()
-def metrics():
+def metrics(days: int = typer.Option(None, "--days", "-d", help="Only average the last N days")):
     """Show average self-evaluation metrics."""
-    evaluator = SelfEvaluator()
-    evaluator.summarize_scores()
+    from asb.brain.score_store import ScoreStore
+    averages = ScoreStore().averages(days)
+    if not averages["n"]:
+        console.print("[red]No self-evaluation data yet.[/red]")
+        return
+    window = f" (last {days} days)" if days else ""
+    console.print(f"[bold cyan]📊 Average Scores{window} — {averages['n']} evaluations[/bold cyan]")
+    for metric in ("clarity", "novelty", "actionability", "redundancy"):
+        console.print(f"  {metric.capitalize()}: {averages[metric]:.2f}")
 
 @app.command()
 def focus():
     """Suggest next learning focus areas."""
-    agent = ASBAgent()
-    evaluator = SelfEvaluator()
-    with open(evaluator.scores_file) as f:
-        logs = f.read()
+    from asb.brain.score_store import ScoreStore
+    agent = services.get_agent()
+    rows = ScoreStore().recent(50)
+    logs = "timestamp,file,clarity,novelty,actionability,redundancy,topics,suggestions\n" + "\n".join(
+        ",".join("" if v is None else str(v) for v in row) for row in rows
+    )
     suggestion = agent.ask(
         f"Based on these self-evaluation logs, suggest 3 learning areas I should focus on next:\n{logs}"
     )
@@ -163,18 +245,20 @@ def focus():
 @app.command()
 def research(max_questions: int = typer.Option(3, "--max", "-m", help="Number of open questions to research")):
     """Autonomously research unanswered questions."""
+    from asb.brain.research_agent import ResearchAgent
     ra = ResearchAgent()
     ra.run_autonomous_research(max_questions)
 
 @app.command()
 def schedule_research():
     """Start weekly autonomous research."""
-    from asb.brain.scheduler_research import start_weekly_research
+    from asb.brain.scheduler import start_weekly_research
     start_weekly_research()
 
 @app.command()
 def automate():
     """Run the full ASB cognitive automation loop."""
+    from asb.brain.automation_graph import workflow
     print("🚀 Starting autonomous ASB loop via LangGraph")
     state = {}
     workflow.invoke(state)
@@ -183,8 +267,9 @@ def automate():
 @app.command()
 def schedule_automate():
     """Schedule daily ASB automation loop."""
+    from asb.brain.scheduler import start_autonomous_loop
     start_autonomous_loop()
 
 
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    app()
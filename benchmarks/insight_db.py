@@ -0,0 +1,77 @@
+# benchmarks/insight_db.py
+"""
+InsightDB throughput / lookup-latency benchmark on a synthetic database.
+
+    uv run python benchmarks/insight_db.py --rows 300000
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from asb.brain.insight_db import InsightDB
+
+TOPICS = ["python", "databases", "machine learning", "distributed systems", "writing",
+          "productivity", "rust", "sqlite", "networking", "statistics"]
+# Zipf-distributed vocabulary so posting-list lengths look like real text
+WORDS = ("the and model memory prompt index cache latency throughput vector embedding commit "
+         "schema query planner transaction replica shard graph token reflection habit").split()
+WORDS += [f"term{i}" for i in range(20_000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+POOL = random.choices(WORDS, cum_weights=CUM_WEIGHTS, k=500_000)
+
+
+def fake_text(n: int) -> str:
+    start = random.randrange(len(POOL) - n)
+    return " ".join(POOL[start:start + n])
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = InsightDB(os.path.join(tmp, "insights.db"))
+
+        start = time.perf_counter()
+        for offset in range(0, opts.rows, opts.batch):
+            n = min(opts.batch, opts.rows - offset)
+            db.add_insights(
+                (random.choice(TOPICS), fake_text(12), fake_text(80), random.sample(WORDS[:200], 3))
+                for _ in range(n)
+            )
+        elapsed = time.perf_counter() - start
+        print(f"📥 Inserted {opts.rows:,} insights in {elapsed:.1f}s ({opts.rows / elapsed:,.0f}/s)")
+
+        print(f"⏱️ Median latency over {opts.repeat} runs")
+        print(f"  query_by_topic('sqlite', limit=20)   {timed(lambda: db.query_by_topic('sqlite', limit=20), opts.repeat):8.2f} ms")
+        print(f"  search('vector cache', limit=10)     {timed(lambda: db.search('vector cache', limit=10), opts.repeat):8.2f} ms  (common terms)")
+        print(f"  search('term150 term900', limit=10)  {timed(lambda: db.search('term150 term900', limit=10), opts.repeat):8.2f} ms  (rare terms)")
+        print(f"  list_topics()                        {timed(db.list_topics, opts.repeat):8.2f} ms")
+        print(f"  count('sqlite')                      {timed(lambda: db.count('sqlite'), opts.repeat):8.2f} ms")
+        print(f"  daily_counts()                       {timed(db.daily_counts, opts.repeat):8.2f} ms")
+        print(f"  topic_counts(10)                     {timed(lambda: db.topic_counts(10), opts.repeat):8.2f} ms")
+        print(f"  tag_counts('sqlite', 15)             {timed(lambda: db.tag_counts('sqlite', 15), opts.repeat):8.2f} ms")
+        print(f"  by_tag('cache', 20)                  {timed(lambda: db.by_tag('cache', 20), opts.repeat):8.2f} ms")
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
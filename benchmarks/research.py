@@ -0,0 +1,86 @@
+# benchmarks/research.py
+"""
+ResearchAgent pipeline latency against a local stub search server and a
+fake LLM with fixed delays (no network, no Ollama needed).
+
+    uv run python benchmarks/research.py --questions 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from asb.brain.research_agent import ResearchAgent
+from asb.brain.web_search import WebSearch
+
+
+class StubSearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so session pooling is exercised
+    delay = (0.2, 0.6)
+
+    def do_GET(self):
+        time.sleep(random.uniform(*self.delay))
+        body = json.dumps({"organic_results": [{"snippet": f"result {i} for {self.path}"} for i in range(5)]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SleepyLLM:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def invoke(self, prompt: str) -> str:
+        time.sleep(self.seconds)
+        return f"summary of {len(prompt)} chars"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--llm-seconds", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    opts = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSearchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}/search"
+    questions = [f"What is concept number {i}?" for i in range(opts.questions)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def run(workers, llm_concurrency, cache_name):
+            searcher = WebSearch(endpoint=endpoint, api_key="stub", cache_path=os.path.join(tmp, cache_name))
+            agent = ResearchAgent(llm=SleepyLLM(opts.llm_seconds), searcher=searcher,
+                                  max_workers=workers, llm_concurrency=llm_concurrency)
+            start = time.perf_counter()
+            agent.find_answers(questions)
+            return time.perf_counter() - start, searcher
+
+        sequential, _ = run(1, 1, "seq.db")
+        concurrent, searcher = run(opts.workers, opts.llm_concurrency, "conc.db")
+        start = time.perf_counter()
+        ResearchAgent(llm=SleepyLLM(opts.llm_seconds), searcher=searcher,
+                      max_workers=opts.workers, llm_concurrency=opts.llm_concurrency).find_answers(questions)
+        cached = time.perf_counter() - start
+
+    server.shutdown()
+    print(f"\n⏱️ {opts.questions} questions (search 0.2–0.6s, LLM {opts.llm_seconds}s)")
+    print(f"  sequential                           {sequential:6.2f} s")
+    print(f"  {opts.workers} workers / {opts.llm_concurrency} LLM slots               {concurrent:6.2f} s")
+    print(f"  same, search cache warm              {cached:6.2f} s  ({searcher.hits} cache hits)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
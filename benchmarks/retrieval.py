@@ -0,0 +1,151 @@
+# benchmarks/retrieval.py
+"""
+Recall / latency of hybrid (BM25 + vector, RRF) retrieval against pure vector
+and pure keyword search, and batched / cached query throughput, on a synthetic
+corpus with two kinds of questions:
+
+  * exact   — an identifier only one document contains (a commit hash, an error code)
+  * concept — a paraphrase that shares meaning but no words with its document
+
+The default embedder is a deterministic stand-in for a dense model: words map
+to shared concept vectors (synonyms land close together) and rare tokens only
+add a weak, noisy component. Pass --ollama to embed with OLLAMA_EMBED_MODEL.
+
+    uv run python benchmarks/retrieval.py --docs 2000 --queries 200
+"""
+import argparse
+import hashlib
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from asb.brain.memory import Memory
+
+DIM = 256
+CONCEPTS = [
+    ("database", "datastore", "db"), ("latency", "delay", "lag"), ("cache", "memoize", "buffer"),
+    ("crash", "failure", "outage"), ("deploy", "release", "ship"), ("index", "lookup", "catalog"),
+    ("query", "request", "question"), ("memory", "recall", "remembering"), ("graph", "network", "web"),
+    ("token", "word", "symbol"), ("schedule", "timetable", "calendar"), ("reflection", "review", "retrospective"),
+    ("embedding", "vector", "representation"), ("parser", "tokenizer", "lexer"), ("thread", "worker", "executor"),
+    ("lock", "mutex", "semaphore"), ("backup", "snapshot", "copy"), ("search", "retrieval", "find"),
+    ("note", "jotting", "memo"), ("habit", "routine", "practice"), ("sleep", "rest", "nap"),
+    ("budget", "allowance", "limit"), ("summary", "digest", "abstract"), ("commit", "changeset", "revision"),
+    ("insight", "learning", "takeaway"), ("error", "exception", "fault"), ("schema", "layout", "structure"),
+    ("prompt", "instruction", "directive"), ("model", "network weights", "checkpoint"), ("topic", "subject", "theme"),
+]
+FILLER = "the a of in on for with and to from was is after before during when we it".split()
+
+
+class ConceptEmbedder:
+    """Bag-of-concepts embedder: synonyms share a vector, unknown tokens add weak hashed noise."""
+    model_name = "benchmark-concepts"
+
+    def __init__(self, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.vectors = {}
+        for group in CONCEPTS:
+            vector = rng.normal(size=DIM)
+            for word in group:
+                self.vectors[word] = vector
+
+    def _token(self, word: str):
+        if word in self.vectors:
+            return self.vectors[word]
+        seed = int(hashlib.md5(word.encode()).hexdigest()[:8], 16)
+        return 0.15 * np.random.default_rng(seed).normal(size=DIM)
+
+    def embed_query(self, text: str):
+        v = sum((self._token(w) for w in text.lower().split() if w not in FILLER), np.zeros(DIM))
+        return (v / (np.linalg.norm(v) or 1.0)).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+
+def build_corpus(n_docs: int, rng: random.Random):
+    docs, exact, concept = [], [], []
+    for i in range(n_docs):
+        groups = rng.sample(range(len(CONCEPTS)), 3)
+        ident = hashlib.sha1(f"doc{i}".encode()).hexdigest()[:10]
+        words = [CONCEPTS[g][0] for g in groups] + rng.sample(FILLER, 5) + [ident]
+        rng.shuffle(words)
+        source = rng.choice(["notes", "git", "notion", "auto_research"])
+        ts = 1_600_000_000 + rng.randrange(4 * 365 * 86400)
+        docs.append((f"doc{i}", " ".join(words), {"source": source, "ts": ts}))
+        exact.append((f"what happened in {ident}", f"doc{i}#0"))
+        concept.append((" ".join(rng.choice(CONCEPTS[g][1:]) for g in groups), f"doc{i}#0"))
+    return docs, exact, concept
+
+
+def evaluate(memory: Memory, queries, mode: str, k: int, filters_for=None):
+    hits, latencies = 0, []
+    for text, expected in queries:
+        filters = filters_for(expected) if filters_for else None
+        start = time.perf_counter()
+        results = memory.search(text, k, filters, mode=mode)
+        latencies.append(time.perf_counter() - start)
+        hits += any(r["id"] == expected for r in results)
+    return hits / len(queries), statistics.median(latencies) * 1000, np.percentile(latencies, 95) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--ollama", action="store_true", help="Embed with the configured Ollama model")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    docs, exact, concept = build_corpus(args.docs, rng)
+    embedder = None if args.ollama else ConceptEmbedder()
+    metadata = {doc_id: meta for doc_id, _, meta in docs}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = Memory(data_dir=tmp, vector_dir=tmp, embedding_model=embedder)
+        start = time.perf_counter()
+        memory.upsert_documents(docs)
+        print(f"Indexed {args.docs} documents in {time.perf_counter() - start:.2f}s\n")
+
+        def same_source(expected):
+            return {"source": metadata[expected.split("#")[0]]["source"]}
+
+        def same_year(expected):
+            ts = metadata[expected.split("#")[0]]["ts"]
+            return {"since": ts - 182 * 86400, "until": ts + 182 * 86400}
+
+        sets = [
+            ("exact", rng.sample(exact, min(args.queries, len(exact))), None),
+            ("concept", rng.sample(concept, min(args.queries, len(concept))), None),
+            ("concept+source", rng.sample(concept, min(args.queries, len(concept))), same_source),
+            ("concept+dates", rng.sample(concept, min(args.queries, len(concept))), same_year),
+        ]
+        print(f"{'queries':<16}{'mode':<9}{'recall@' + str(args.k):>10}{'p50 ms':>9}{'p95 ms':>9}")
+        for name, queries, filters_for in sets:
+            for mode in ("vector", "lexical", "hybrid"):
+                recall, p50, p95 = evaluate(memory, queries, mode, args.k, filters_for)
+                print(f"{name:<16}{mode:<9}{recall:>10.2f}{p50:>9.2f}{p95:>9.2f}")
+
+        texts = [text for text, _ in sets[1][1]]
+        memory._invalidate()
+        start = time.perf_counter()
+        for text in texts:
+            memory.query(text, args.k)
+        one_by_one = time.perf_counter() - start
+        memory._invalidate()
+        start = time.perf_counter()
+        memory.query_many(texts, args.k)
+        batched = time.perf_counter() - start
+        start = time.perf_counter()
+        memory.query_many(texts, args.k)
+        cached = time.perf_counter() - start
+        print(f"\n{len(texts)} hybrid queries: one by one {one_by_one * 1000:.1f}ms, "
+              f"query_many {batched * 1000:.1f}ms, repeated (LRU) {cached * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
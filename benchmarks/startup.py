@@ -0,0 +1,74 @@
+# benchmarks/startup.py
+"""
+CLI startup benchmark.
+
+Reports the slowest imports of the CLI module (parsed from `python -X importtime`)
+and the wall-clock time of lightweight commands.
+
+    uv run python benchmarks/startup.py
+    uv run python benchmarks/startup.py --top 25 --runs 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+LIGHT_COMMANDS = [
+    ["--help"],
+    ["logs", "--days", "0"],
+    ["insights", "__startup_bench__"],
+]
+
+
+def import_times(module: str):
+    """Return [(cumulative_us, self_us, name)] for every module imported by `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def time_command(args: list[str], runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "asb.main", *args], capture_output=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="asb.main", help="Module to profile")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command timing")
+    opts = parser.parse_args()
+
+    rows = import_times(opts.module)
+    if not rows:
+        print(f"⚠️ Could not import {opts.module}")
+        return 1
+    total = next((cum for cum, _, name in rows if name.strip() == opts.module), max(r[0] for r in rows))
+    print(f"📦 import {opts.module}: {total / 1000:.1f} ms cumulative, {len(rows)} modules")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cum, own, name in sorted(rows, reverse=True)[:opts.top]:
+        print(f"{cum / 1000:>14.1f} {own / 1000:>9.1f}  {name}")
+
+    print(f"\n⏱️ Command wall-clock (median of {opts.runs} runs)")
+    for args in LIGHT_COMMANDS:
+        samples = time_command(args, opts.runs)
+        print(f"  asb {' '.join(args):<32} {statistics.median(samples) * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+# tests/conftest.py
+import hashlib
+import pytest
+from asb.brain import services
+
+
+class FakeEmbedder:
+    """Deterministic hashed bag-of-words embedder, so tests need neither Ollama nor a model download."""
+    model_name = "fake"
+    dim = 64
+
+    def embed_documents(self, texts):
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+            norm = sum(x * x for x in vector) ** 0.5 or 1.0
+            vectors.append([x / norm for x in vector])
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture(autouse=True)
+def _reset_services():
+    yield
+    services.reset()
+
+
+@pytest.fixture
+def notes_dir(tmp_path):
+    path = tmp_path / "notes"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def make_memory(tmp_path, notes_dir):
+    """Open another Memory over the same store (as a second process would)."""
+    from asb.brain.memory import Memory
+
+    def make(**kwargs):
+        return Memory(str(notes_dir), str(tmp_path / "vector_store"), embedding_model=FakeEmbedder(), **kwargs)
+    return make
+
+
+@pytest.fixture
+def memory(make_memory):
+    m = make_memory()
+    services._instances["memory"] = m
+    return m
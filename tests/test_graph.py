@@ -0,0 +1,55 @@
+# tests/test_graph.py
+import pytest
+from asb.brain.graph import CooccurrenceMatrix, KnowledgeGraph
+
+
+def test_top_k_returns_only_positive_pmi():
+    # "hub" co-occurs with everything, so PPMI clips python–hub to 0
+    matrix = CooccurrenceMatrix.from_edges(
+        ["python", "python", "python", "hub", "hub", "hub", "hub"],
+        ["hub", "code", "safety", "x", "y", "z", "w"],
+        [1, 9, 1, 9, 9, 9, 9], {}, n_notes=10,
+    )
+    python, hub, unknown = matrix.top_k(["python", "hub", "nope"], 5)
+    assert [word for word, _ in python] == ["code", "safety"]
+    assert sorted(word for word, _ in hub) == ["w", "x", "y", "z"]
+    assert unknown == []
+    assert all(score > 0 for _, score in python + hub)
+    assert matrix.top_k(["python"], 1) == [python[:1]]
+
+
+def test_matrix_round_trips_through_save(tmp_path):
+    matrix = CooccurrenceMatrix.from_edges(["a"], ["b"], [3], {"a": 1, "b": 1}, n_notes=1, version=7)
+    path = str(tmp_path / "graph.npz")
+    matrix.save(path)
+    loaded = CooccurrenceMatrix.load(path)
+    assert loaded.version == 7
+    assert loaded.top_k(["a"], 3, method="count") == [[("b", 3.0)]]
+
+
+@pytest.fixture
+def graph(tmp_path):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "db.md").write_text("sqlite database index sqlite database")
+    (notes / "py.md").write_text("python numpy vectorize python numpy")
+    graph = KnowledgeGraph(str(notes), db_path=str(tmp_path / "graph.db"))
+    graph.build()
+    yield graph
+    graph.close()
+
+
+def test_graph_updates_per_note(graph, tmp_path):
+    assert "database" in [word for word, _ in graph.related("sqlite", method="count")]
+    note = tmp_path / "notes" / "db.md"
+    assert graph.update_note(str(note)) is False  # unchanged
+
+    note.write_text("sqlite journal checkpoint sqlite journal")
+    assert graph.update_note(str(note)) is True
+    related = [word for word, _ in graph.related("sqlite", method="count")]
+    assert "journal" in related and "database" not in related
+
+    note.unlink()
+    assert graph.update_note(str(note)) is True
+    assert graph.related("sqlite") == []
+    assert graph.related("python", method="count")
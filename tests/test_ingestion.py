@@ -0,0 +1,60 @@
+# tests/test_ingestion.py
+import os
+import pytest
+from asb.brain.ingestion import ContextIngestor, entry_doc_id
+from asb.brain.sources.files_adapter import FilesAdapter
+
+
+@pytest.fixture
+def external(tmp_path):
+    path = tmp_path / "external"
+    path.mkdir()
+    (path / "a.md").write_text("first external note")
+    return path
+
+
+def local_files(memory):
+    stored = memory.collection.get(where={"source": "local_file"})
+    return sorted(zip(stored["ids"], (m["path"] for m in stored["metadatas"])))
+
+
+def test_reingest_skips_unchanged_and_replaces_edited(memory, external):
+    ingestor = ContextIngestor(adapters=[FilesAdapter(str(external))])
+    assert ingestor.ingest_all()["files"]["added"] == 1
+    assert ingestor.ingest_all()["files"]["skipped"] == 1
+    (external / "a.md").write_text("first external note, edited")
+    assert ingestor.ingest_all()["files"]["updated"] == 1
+    assert [doc for doc in memory.collection.get()["documents"]] == ["first external note, edited"]
+
+
+def test_relative_and_absolute_folders_share_ids(memory, external, monkeypatch):
+    monkeypatch.chdir(external.parent)
+    ContextIngestor(adapters=[FilesAdapter("external")]).ingest_all()
+    ContextIngestor(adapters=[FilesAdapter(str(external))]).ingest_all()
+    assert local_files(memory) == [(entry_doc_id({"source": "local_file", "path": str(external / "a.md")}) + "#0",
+                                    str(external / "a.md"))]
+
+
+def test_files_stored_under_relative_paths_are_replaced(memory, external, monkeypatch):
+    monkeypatch.chdir(external.parent)
+    legacy = entry_doc_id({"source": "local_file", "path": "external/a.md"})
+    written = memory.upsert_documents([(legacy, "first external note", {"source": "local_file", "path": "external/a.md"})])
+    memory._save_manifest({legacy: {"sha256": "old", "ids": written[legacy]}}, memory.sources_manifest_path)
+
+    ContextIngestor(adapters=[FilesAdapter("external")]).ingest_all()
+    assert [path for _, path in local_files(memory)] == [str(external / "a.md")]
+    assert legacy not in memory._load_manifest(memory.sources_manifest_path)
+
+
+def test_ingest_files_removes_deleted_files(memory, external):
+    adapter = FilesAdapter(str(external))
+    ingestor = ContextIngestor(adapters=[adapter])
+    (external / "b.md").write_text("second external note")
+    ingestor.ingest_all()
+    assert ingestor.stored_paths(adapter) == {str(external / "a.md"), str(external / "b.md")}
+
+    os.remove(external / "b.md")
+    counts = ingestor.ingest_files(sorted(ingestor.stored_paths(adapter)), adapter)
+    assert counts["removed"] == 1
+    assert [path for _, path in local_files(memory)] == [str(external / "a.md")]
+    assert len(memory._load_manifest(memory.sources_manifest_path)) == 1
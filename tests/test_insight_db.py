@@ -0,0 +1,58 @@
+# tests/test_insight_db.py
+from datetime import datetime
+import pytest
+from asb.brain.insight_db import InsightDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = InsightDB(str(tmp_path / "insights.db"))
+    db.add_insights([
+        ("sleep", "How much sleep do I need?", "Seven to nine hours of rest.", ["health", " habits "]),
+        ("sleep", "Does caffeine hurt sleep?", "Avoid coffee after noon.", "health,coffee,health"),
+        ("python", "Why is my loop slow?", "Vectorize it with numpy.", ["performance"]),
+    ])
+    yield db
+    db.close()
+
+
+def test_full_text_search_ranks_matches(db):
+    hits = db.search("coffee")
+    assert [hit[2] for hit in hits] == ["Does caffeine hurt sleep?"]
+    assert "[coffee]" in hits[0][3]
+    assert db.search("no such words anywhere") == []
+
+
+def test_topic_prefix_query(db):
+    assert len(db.query_by_topic("sle")) == 2
+    assert db.query_by_topic("python", limit=1)[0][1] == "Why is my loop slow?"
+
+
+def test_tags_are_normalised(db):
+    assert db.tag_counts() == [("health", 2), ("coffee", 1), ("habits", 1), ("performance", 1)]
+    assert [row[2] for row in db.by_tag("coffee")] == ["Does caffeine hurt sleep?"]
+
+
+def test_rollups_follow_inserts_and_deletes(db):
+    today = datetime.now().strftime("%Y-%m-%d")
+    assert db.count() == 3 and db.count("sleep") == 2
+    assert db.topic_counts() == [("sleep", 2), ("python", 1)]
+    assert db.daily_counts() == [(today, 3)]
+    assert db.daily_counts("python") == [(today, 1)]
+
+    version = db.version()
+    with db.conn:
+        db.conn.execute("DELETE FROM insights WHERE topic = 'sleep'")
+    assert db.version() > version
+    assert db.count() == 1 and db.count("sleep") == 0
+    assert db.topic_counts() == [("python", 1)]
+    assert db.daily_counts() == [(today, 1)]
+    assert db.tag_counts() == [("performance", 1)]
+    assert db.search("coffee") == []
+
+
+def test_rollups_survive_reopening(db, tmp_path):
+    reopened = InsightDB(str(tmp_path / "insights.db"))
+    assert reopened.count() == 3
+    assert reopened.tag_counts("sleep") == [("health", 2), ("coffee", 1), ("habits", 1)]
+    reopened.close()
@@ -0,0 +1,144 @@
+# tests/test_memory.py
+import os
+import subprocess
+import sys
+import textwrap
+from datetime import datetime
+import pytest
+from asb.brain.memory import as_timestamp, chroma_where
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def stored_ids(memory):
+    return sorted(memory.collection.get()["ids"])
+
+
+# --- incremental note ingestion -------------------------------------------------
+def test_ingest_notes_skips_unchanged_and_removes_deleted(memory, notes_dir):
+    (notes_dir / "a.md").write_text("alpha note")
+    (notes_dir / "b.md").write_text("beta note")
+    assert memory.ingest_notes() == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+    assert memory.ingest_notes() == {"added": 0, "updated": 0, "removed": 0, "unchanged": 2}
+
+    (notes_dir / "a.md").write_text("alpha note, edited")
+    (notes_dir / "b.md").unlink()
+    assert memory.ingest_notes() == {"added": 0, "updated": 1, "removed": 1, "unchanged": 0}
+    assert stored_ids(memory) == ["a.md#0"]
+    assert memory.collection.get(ids=["a.md#0"])["documents"] == ["alpha note, edited"]
+    assert memory.lexical.count() == 1
+
+
+def test_touched_but_unedited_note_is_not_reembedded(memory, notes_dir):
+    note = notes_dir / "a.md"
+    note.write_text("alpha note")
+    memory.ingest_notes()
+    os.utime(note, (1_700_000_000, 1_700_000_000))
+    assert memory.ingest_notes()["unchanged"] == 1
+
+
+def test_shrunk_note_drops_its_stale_chunks(memory, notes_dir):
+    note = notes_dir / "long.md"
+    note.write_text("\n\n".join(f"## Section {i}\n" + " ".join(["word"] * 200) for i in range(4)))
+    memory.ingest_notes()
+    assert len(stored_ids(memory)) > 1
+    note.write_text("short now")
+    memory.ingest_notes()
+    assert stored_ids(memory) == ["long.md#0"]
+    assert memory.lexical.count() == 1
+
+
+def test_ingest_paths_syncs_only_the_given_files(memory, notes_dir):
+    note = notes_dir / "a.md"
+    note.write_text("gamma")
+    assert memory.ingest_paths([str(note), str(notes_dir / "ignored.pdf")])["added"] == 1
+    note.unlink()
+    assert memory.ingest_paths([str(note)])["removed"] == 1
+    assert stored_ids(memory) == []
+
+
+# --- hybrid retrieval and filters -------------------------------------------------
+@pytest.fixture
+def dated(memory):
+    memory.upsert_documents([
+        ("fix", "fixed the parser crash in commit 3f9a2c1", {"source": "git", "ts": datetime(2024, 5, 1, 12).timestamp()}),
+        ("note", "thoughts about the parser crash", {"source": "notes", "ts": datetime(2024, 5, 2, 9).timestamp()}),
+    ])
+    return memory
+
+
+def test_hybrid_search_finds_exact_identifiers(dated):
+    assert dated.search("3f9a2c1", 1)[0]["id"] == "fix#0"
+    assert [hit["id"] for hit in dated.search("3f9a2c1", 5, mode="lexical")] == ["fix#0"]
+
+
+@pytest.mark.parametrize("mode", ["hybrid", "vector", "lexical"])
+def test_source_filter(dated, mode):
+    hits = dated.search("parser crash", 5, {"source": "notes"}, mode=mode)
+    assert [hit["id"] for hit in hits] == ["note#0"]
+
+
+@pytest.mark.parametrize("mode", ["hybrid", "vector", "lexical"])
+def test_date_only_until_includes_that_day(dated, mode):
+    assert [hit["id"] for hit in dated.search("parser crash", 5, {"until": "2024-05-01"}, mode=mode)] == ["fix#0"]
+    assert [hit["id"] for hit in dated.search("parser crash", 5, {"since": "2024-05-02"}, mode=mode)] == ["note#0"]
+    assert dated.search("parser crash", 5, {"since": "2024-05-03"}, mode=mode) == []
+
+
+def test_as_timestamp():
+    midnight = datetime(2024, 5, 1).timestamp()
+    assert as_timestamp("2024-05-01") == midnight
+    assert as_timestamp("2024-05-01", end_of_day=True) == pytest.approx(midnight + 86400, abs=1e-3)
+    assert as_timestamp("2024-05-01T00:00:00Z") == datetime.fromisoformat("2024-05-01T00:00:00+00:00").timestamp()
+    assert as_timestamp(None) is None and as_timestamp(12.5) == 12.5
+    with pytest.raises(ValueError):
+        as_timestamp("yesterday")
+
+
+def test_chroma_where():
+    assert chroma_where(None) is None
+    assert chroma_where({"source": "git"}) == {"source": "git"}
+    assert chroma_where({"source": "git", "since": 1, "until": 2}) == {
+        "$and": [{"source": "git"}, {"ts": {"$gte": 1}}, {"ts": {"$lte": 2}}]
+    }
+
+
+def test_chunks_without_ts_are_backfilled_once(memory, make_memory):
+    # As written before chunks carried a timestamp
+    memory.collection.upsert(ids=["old#0"], documents=["legacy commit"], metadatas=[{"source": "git"}])
+    memory.lexical.upsert(["old#0"], ["legacy commit"], [{"source": "git"}])
+    assert memory.lexical.ids_without_ts() == ["old#0"]
+
+    reopened = make_memory()
+    assert reopened.lexical.ids_without_ts() == []
+    assert reopened.collection.get(ids=["old#0"])["metadatas"][0]["ts"] is not None
+    assert [hit["id"] for hit in reopened.search("legacy commit", 3, {"since": "2000-01-01"})] == ["old#0"]
+    assert reopened.backfill_timestamps() == 0
+
+
+# --- query cache ----------------------------------------------------------------
+def test_query_many_matches_query_and_is_cached(memory):
+    memory.upsert_documents([("a", "zebra crossing", {"source": "notes"}), ("b", "apple pie", {"source": "notes"})])
+    assert memory.query_many(["zebra", "apple"], 1) == [memory.query("zebra", 1), memory.query("apple", 1)]
+    assert memory.cache_hits == 2
+    memory.upsert_documents([("c", "zebra stripes", {"source": "notes"})])
+    assert "zebra stripes" in memory.query("zebra", 3)
+
+
+def test_query_cache_sees_writes_from_another_process(memory, tmp_path, notes_dir):
+    memory.upsert_documents([("a", "zebra crossing", {"source": "notes"})])
+    assert memory.query("zebra", 3) == ["zebra crossing"]
+    assert memory.query("zebra", 3) == ["zebra crossing"]
+    assert memory.cache_hits == 1
+
+    script = textwrap.dedent(f"""
+        from asb.brain.memory import Memory
+        from tests.conftest import FakeEmbedder
+        memory = Memory({str(notes_dir)!r}, {str(tmp_path / "vector_store")!r}, embedding_model=FakeEmbedder())
+        memory.upsert_documents([("b", "zebra stripes", {{"source": "notes"}})])
+    """)
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=ROOT,
+                   env={**os.environ, "PYTHONPATH": os.pathsep.join([ROOT, *sys.path])})
+
+    assert sorted(memory.query("zebra", 3)) == ["zebra crossing", "zebra stripes"]
+    assert memory.cache_hits == 1
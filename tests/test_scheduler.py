@@ -0,0 +1,43 @@
+# tests/test_scheduler.py
+import pytest
+from asb.brain import scheduler
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "scheduler.db")
+    monkeypatch.setattr(scheduler, "SCHEDULER_DB_PATH", path)
+    return path
+
+
+def test_second_daemon_cannot_take_the_lock(db_path):
+    lock = scheduler._acquire_lock()
+    try:
+        with pytest.raises(RuntimeError, match="already using"):
+            scheduler._acquire_lock()
+    finally:
+        lock.close()
+    scheduler._acquire_lock().close()
+
+
+def test_unknown_jobs_are_rejected(db_path):
+    with pytest.raises(ValueError, match="Unknown jobs"):
+        scheduler.run_daemon(["nope"])
+
+
+def test_jobs_keep_their_schedule_across_restarts(db_path):
+    pytest.importorskip("apscheduler")
+    first = scheduler.create_scheduler(["reflection"])
+    first.start(paused=True)
+    scheduler.ensure_job(first, "reflection")
+    next_run = first.get_job("reflection", jobstore="reflection").next_run_time
+    first.shutdown(wait=False)
+
+    second = scheduler.create_scheduler(["reflection", "research"])
+    second.start(paused=True)
+    scheduler.ensure_job(second, "reflection")
+    assert second.get_job("reflection", jobstore="reflection").next_run_time == next_run
+    assert second.get_job("research", jobstore="research") is None
+    scheduler.ensure_job(second, "reflection", reset=True)
+    assert second.get_job("reflection", jobstore="reflection").next_run_time > next_run
+    second.shutdown(wait=False)
@@ -0,0 +1,40 @@
+# tests/test_score_store.py
+import pytest
+from asb.brain.score_store import ScoreStore, parse_eval_text
+
+EVAL = "Clarity: 8\nNovelty: 6\nActionability: 7\nRedundancy: 2"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.db"), legacy_csv=None)
+    yield store
+    store.close()
+
+
+def test_parse_eval_text():
+    assert parse_eval_text(EVAL) == {"clarity": 8.0, "novelty": 6.0, "actionability": 7.0,
+                                     "redundancy": 2.0, "topics": "", "suggestions": ""}
+    assert parse_eval_text("no scores here") is None
+
+
+def test_one_score_per_content_hash_and_model(store):
+    assert store.version() == 0
+    store.add_score("a.md", "m", EVAL, content_hash="h1")
+    store.add_score("a.md", "m", EVAL, content_hash="h1")
+    store.add_score("a.md", "other", EVAL, content_hash="h1")
+    version = store.version()
+    assert store.averages()["n"] == 2
+    store.add_score("b.md", "m", "Clarity: 4\nNovelty: 2\nActionability: 3\nRedundancy: 6", content_hash="h2")
+    assert store.version() > version
+
+    averages = store.averages(days=1)
+    assert averages["n"] == 3
+    assert averages["clarity"] == pytest.approx((8 + 8 + 4) / 3)
+    assert [row[1] for row in store.daily()] == [3]
+
+
+def test_cached_evaluations(store):
+    assert store.get_cached("h1", "m") is None
+    store.put_cached("h1", "m", "a.md", EVAL)
+    assert store.get_cached("h1", "m") is not None
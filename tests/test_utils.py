@@ -0,0 +1,24 @@
+# tests/test_utils.py
+import os
+from asb.brain.utils import load_json, open_sqlite, save_json, update_json
+
+
+def test_load_json_tolerates_missing_and_corrupt_files(tmp_path):
+    path = tmp_path / "state.json"
+    assert load_json(str(path)) == {}
+    path.write_text("{not json")
+    assert load_json(str(path)) == {}
+
+
+def test_save_and_update_json(tmp_path):
+    path = str(tmp_path / "nested" / "state.json")
+    save_json(path, {"a": 1})
+    update_json(path, lambda data: data.update(b=2))
+    assert load_json(path) == {"a": 1, "b": 2}
+    assert os.listdir(tmp_path / "nested") == ["state.json"]
+
+
+def test_open_sqlite_uses_wal(tmp_path):
+    conn = open_sqlite(str(tmp_path / "db" / "x.db"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()